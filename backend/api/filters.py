@@ -1,6 +1,7 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
 
-from recipes.models import Ingredient, Recipe, Tag
+from recipes.models import Favorites, Ingredient, Recipe, ShoppingCart, Tag
 
 
 class RecipeFilter(filters.FilterSet):
@@ -8,7 +9,8 @@ class RecipeFilter(filters.FilterSet):
         queryset=Tag.objects.all(),
         field_name='tags__slug',
         to_field_name='slug',
-        label='Tags'
+        label='Tags',
+        method='filter_tags'
     )
 
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
@@ -20,18 +22,30 @@ class RecipeFilter(filters.FilterSet):
         model = Recipe
         fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
 
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe=OuterRef('pk'),
+                tag_id__in=[tag.id for tag in value]
+            )
+        ))
+
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return queryset.filter(favorite_recipe__user=user)
+            return queryset.filter(Exists(
+                Favorites.objects.filter(user=user, recipe=OuterRef('pk'))
+            ))
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return queryset.filter(
-                shopping_cart_recipe__user=user
-            )
+            return queryset.filter(Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef('pk'))
+            ))
         return queryset
 
 
@@ -0,0 +1,250 @@
+import atexit
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+
+FINGERPRINT_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+ARCHIVE_FILENAME = 'archive.json'
+LOCK_FILENAME = 'archive.lock'
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_file_pid(filename):
+    pid = filename.split('-', 1)[0]
+    return int(pid) if pid.isdigit() else None
+
+
+def read_metrics(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_metrics(path, data):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+class MetricsCollector:
+    def __init__(self, path=None, buckets=settings.METRICS_BUCKETS):
+        self.default_path = path
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    @property
+    def path(self):
+        return self.default_path or settings.METRICS_PATH
+
+    @property
+    def file(self):
+        return os.path.join(self.path, self.filename)
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.filename = f'{self.pid}-{uuid.uuid4().hex[:8]}.json'
+        self.requests = {}
+        self.statements = {}
+        self.flushed = time.monotonic()
+        self.timer = None
+
+    def new_entry(self):
+        return {
+            'count': 0,
+            'sum': 0,
+            'queries': 0,
+            'buckets': [0] * len(self.buckets),
+        }
+
+    def record(self, method, route, seconds, queries, statements):
+        with self.lock:
+            if os.getpid() != self.pid:
+                self.reset()
+            entry = self.requests.setdefault(
+                f'{method} {route}', self.new_entry()
+            )
+            entry['count'] += 1
+            entry['sum'] += seconds
+            entry['queries'] += queries
+            for number, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry['buckets'][number] += 1
+            for sql, (calls, total) in statements.items():
+                statement = self.statements.setdefault(sql, [0, 0])
+                statement[0] += calls
+                statement[1] += total
+            waited = time.monotonic() - self.flushed
+            if waited >= settings.METRICS_FLUSH_INTERVAL:
+                self.flush()
+            elif self.timer is None:
+                self.timer = threading.Timer(
+                    settings.METRICS_FLUSH_INTERVAL - waited,
+                    self.flush_idle
+                )
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush_idle(self):
+        with self.lock:
+            self.timer = None
+            self.flush()
+
+    def flush(self):
+        if os.getpid() != self.pid or not self.requests:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        write_metrics(
+            self.file,
+            {'requests': self.requests, 'statements': self.statements}
+        )
+        self.flushed = time.monotonic()
+
+    def merge(self, requests, statements, data):
+        for key, values in data['requests'].items():
+            merged = requests.setdefault(key, self.new_entry())
+            for name in ('count', 'sum', 'queries'):
+                merged[name] += values[name]
+            merged['buckets'] = [
+                left + right for left, right in zip(
+                    merged['buckets'], values['buckets']
+                )
+            ]
+        for sql, (calls, total) in data['statements'].items():
+            statement = statements.setdefault(sql, [0, 0])
+            statement[0] += calls
+            statement[1] += total
+
+    def archive_dead_files(self):
+        archive = os.path.join(self.path, ARCHIVE_FILENAME)
+        with open(os.path.join(self.path, LOCK_FILENAME), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = [
+                entry.path for entry in os.scandir(self.path)
+                if entry.name.endswith('.json')
+                and get_file_pid(entry.name) not in (None, self.pid)
+                and not is_alive(get_file_pid(entry.name))
+            ]
+            if not dead:
+                return
+            data = read_metrics(archive) or {'requests': {}, 'statements': {}}
+            requests, statements = data['requests'], data['statements']
+            for path in dead:
+                merged = read_metrics(path)
+                if merged is not None:
+                    self.merge(requests, statements, merged)
+            write_metrics(archive, data)
+            for path in dead:
+                os.remove(path)
+
+    def collect(self):
+        with self.lock:
+            self.flush()
+        requests, statements = {}, {}
+        if not os.path.isdir(self.path):
+            return requests, statements
+        self.archive_dead_files()
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith('.json'):
+                continue
+            data = read_metrics(entry.path)
+            if data is not None:
+                self.merge(requests, statements, data)
+        return requests, statements
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace(
+        '"', '\\"'
+    )
+
+
+def render_metrics(requests, statements, buckets, top):
+    lines = [
+        '# HELP foodgram_http_request_duration_seconds Время ответа API.',
+        '# TYPE foodgram_http_request_duration_seconds histogram',
+    ]
+    for key, entry in sorted(requests.items()):
+        method, route = key.split(' ', 1)
+        labels = f'route="{escape(route)}",method="{method}"'
+        for bound, count in zip(buckets, entry['buckets']):
+            lines.append(
+                'foodgram_http_request_duration_seconds_bucket'
+                f'{{{labels},le="{bound}"}} {count}'
+            )
+        lines.extend((
+            'foodgram_http_request_duration_seconds_bucket'
+            f'{{{labels},le="+Inf"}} {entry["count"]}',
+            f'foodgram_http_request_duration_seconds_sum{{{labels}}} '
+            f'{entry["sum"]:.6f}',
+            f'foodgram_http_request_duration_seconds_count{{{labels}}} '
+            f'{entry["count"]}',
+        ))
+    lines.extend((
+        '# HELP foodgram_db_queries_total SQL-запросы по эндпоинтам.',
+        '# TYPE foodgram_db_queries_total counter',
+    ))
+    for key, entry in sorted(requests.items()):
+        method, route = key.split(' ', 1)
+        lines.append(
+            f'foodgram_db_queries_total{{route="{escape(route)}",'
+            f'method="{method}"}} {entry["queries"]}'
+        )
+    top_statements = sorted(
+        statements.items(), key=lambda item: item[1][1], reverse=True
+    )[:top]
+    lines.extend((
+        '# HELP foodgram_sql_calls_total Вызовы самых тяжёлых SQL-шаблонов.',
+        '# TYPE foodgram_sql_calls_total counter',
+    ))
+    lines.extend(
+        f'foodgram_sql_calls_total{{fingerprint="{escape(sql)}"}} {calls}'
+        for sql, (calls, _) in top_statements
+    )
+    lines.extend((
+        '# HELP foodgram_sql_seconds_total Время самых тяжёлых SQL-шаблонов.',
+        '# TYPE foodgram_sql_seconds_total counter',
+    ))
+    lines.extend(
+        f'foodgram_sql_seconds_total{{fingerprint="{escape(sql)}"}} '
+        f'{total:.6f}'
+        for sql, (_, total) in top_statements
+    )
+    return '\n'.join(lines) + '\n'
+
+
+collector = MetricsCollector()
+atexit.register(collector.flush)
@@ -0,0 +1,149 @@
+import cProfile
+import hmac
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import collector, fingerprint
+
+
+def get_route(request):
+    match = request.resolver_match
+    return match.view_name if match else 'unknown'
+
+
+def has_profiling_token(request):
+    token = request.headers.get(settings.PROFILING_HEADER)
+    return bool(token and settings.PROFILING_TOKEN and hmac.compare_digest(
+        token, settings.PROFILING_TOKEN
+    ))
+
+
+def should_profile(request):
+    if request.headers.get(settings.PROFILING_HEADER) and (
+        settings.PROFILING_TOKEN
+    ):
+        return has_profiling_token(request)
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def can_see_timing(request):
+    user = getattr(request, 'user', None)
+    return has_profiling_token(request) or bool(user and user.is_staff)
+
+
+def save_profile(profile, request):
+    os.makedirs(settings.PROFILING_PATH, exist_ok=True)
+    name = '{}-{}-{}-{}.prof'.format(
+        time.strftime('%Y%m%d%H%M%S'),
+        request.method.lower(),
+        get_route(request).replace(':', '-'),
+        uuid.uuid4().hex[:8]
+    )
+    profile.dump_stats(os.path.join(settings.PROFILING_PATH, name))
+    profiles = sorted(
+        entry.path for entry in os.scandir(settings.PROFILING_PATH)
+        if entry.name.endswith('.prof')
+    )
+    for path in profiles[:-settings.PROFILING_MAX_FILES]:
+        os.remove(path)
+    return name
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = self.view_finished = None
+        self.render_started = self.render_finished = None
+        self.finished = None
+        self.db = 0
+        self.queries = 0
+        self.statements = defaultdict(lambda: [0, 0])
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - started
+            self.db += seconds
+            self.queries += 1
+            statement = self.statements[fingerprint(sql)]
+            statement[0] += 1
+            statement[1] += seconds
+
+    def header(self):
+        metrics = [
+            ('db', self.db, f'{self.queries} queries'),
+            ('view', (self.view_finished or self.finished) - (
+                self.view_started or self.started
+            ), None),
+        ]
+        if self.render_started and self.render_finished:
+            metrics.append(
+                ('render', self.render_finished - self.render_started, None)
+            )
+        metrics.append(('total', self.finished - self.started, None))
+        return ', '.join(
+            f'{name};dur={seconds * 1000:.2f}'
+            + (f';desc="{description}"' if description else '')
+            for name, seconds, description in metrics
+        )
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.timing = timing = RequestTiming()
+        profile = cProfile.Profile() if should_profile(request) else None
+        try:
+            if profile is not None:
+                profile.enable()
+        except ValueError:
+            profile = None
+        try:
+            with connection.execute_wrapper(timing):
+                response = self.get_response(request)
+        finally:
+            if profile is not None:
+                profile.disable()
+        timing.finished = time.perf_counter()
+        if timing.view_finished is None:
+            timing.view_finished = timing.finished
+        visible = can_see_timing(request)
+        if visible:
+            response['Server-Timing'] = timing.header()
+        collector.record(
+            request.method,
+            get_route(request),
+            timing.finished - timing.started,
+            timing.queries,
+            timing.statements
+        )
+        if profile is not None:
+            name = save_profile(profile, request)
+            if visible:
+                response[settings.PROFILING_RESULT_HEADER] = name
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = request.timing
+        timing.view_finished = timing.render_started = time.perf_counter()
+        response.add_post_render_callback(self.finish_render(timing))
+        return response
+
+    @staticmethod
+    def finish_render(timing):
+        def callback(response):
+            timing.render_finished = time.perf_counter()
+        return callback
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from recipes.reference_data import (get_reference_etags,
+                                    get_reference_response,
+                                    get_reference_version)
+
+
+class ReferenceDataMixin:
+    reference_name = None
+
+    def is_reference_list(self, request):
+        return self.action == 'list' and not (
+            set(request.query_params) - {'version'}
+        )
+
+    def perform_authentication(self, request):
+        if not (
+            self.is_reference_list(request)
+            and 'If-None-Match' in request.headers
+        ):
+            super().perform_authentication(request)
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_reference_list(request):
+            return super().list(request, *args, **kwargs)
+        version = get_reference_version()
+        if version is None:
+            return super().list(request, *args, **kwargs)
+        cache_control = f'public, max-age={settings.REFERENCE_DATA_MAX_AGE}'
+        if request.query_params.get('version') == version:
+            cache_control = (
+                'public, immutable, '
+                f'max-age={settings.REFERENCE_DATA_IMMUTABLE_MAX_AGE}'
+            )
+        use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        etag = get_reference_etags(self.reference_name, version)[use_gzip]
+        if self.etag_matches(request, etag):
+            return self.finalize_reference_response(
+                HttpResponseNotModified(), etag, cache_control, version
+            )
+        cached = get_reference_response(
+            self.reference_name,
+            version,
+            lambda: JSONRenderer().render(
+                self.get_serializer(
+                    self.filter_queryset(self.get_queryset()),
+                    many=True
+                ).data
+            )
+        )
+        response = HttpResponse(
+            cached['gzip_body'] if use_gzip else cached['body'],
+            content_type='application/json'
+        )
+        if use_gzip:
+            response['Content-Encoding'] = 'gzip'
+        return self.finalize_reference_response(
+            response, etag, cache_control, version
+        )
+
+    @staticmethod
+    def etag_matches(request, etag):
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        return '*' in etags or etag in (
+            value[2:] if value.startswith('W/') else value for value in etags
+        )
+
+    @staticmethod
+    def finalize_reference_response(response, etag, cache_control, version):
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        response['Vary'] = 'Accept-Encoding'
+        response['X-Reference-Version'] = version
+        return response
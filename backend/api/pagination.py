@@ -1,5 +1,107 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+INVALID_CURSOR_MESSAGE = 'Неверный курсор.'
+
+
+class KeysetPagination(BasePagination):
+    page_size = 6
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, 'cursor_ordering', self.ordering)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        results = results[:page_size]
+        self.last = results[-1] if results else None
+        return results
+
+    def get_page_size(self, request):
+        page_size = request.query_params.get(self.page_size_query_param, '')
+        if page_size.isdigit() and int(page_size) > 0:
+            return min(int(page_size), self.max_page_size)
+        return self.page_size
+
+    def get_position_filter(self, position):
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise NotFound(INVALID_CURSOR_MESSAGE)
+
+    def encode_cursor(self, instance):
+        values = [field.value_to_string(instance) for field in self.fields]
+        return urlsafe_b64encode(json.dumps(values).encode()).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.last)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        )))
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 6
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            KeysetPagination.cursor_query_param in request.query_params
+            or getattr(view, 'cursor_pagination', False)
+        ):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,25 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+INVALID_JSON_PART_MESSAGE = 'Поле {field} должно содержать корректный JSON.'
+
+
+class MultiPartJSONParser(MultiPartParser):
+    json_field = 'data'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        result = super().parse(stream, media_type, parser_context)
+        try:
+            data = json.loads(result.data.get(self.json_field, '{}'))
+        except ValueError:
+            raise ParseError(
+                INVALID_JSON_PART_MESSAGE.format(field=self.json_field)
+            )
+        if not isinstance(data, dict):
+            raise ParseError(
+                INVALID_JSON_PART_MESSAGE.format(field=self.json_field)
+            )
+        data.update(result.files.dict())
+        return DataAndFiles(data, {})
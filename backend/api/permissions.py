@@ -1,3 +1,6 @@
+import ipaddress
+
+from django.conf import settings
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 
@@ -12,3 +15,29 @@ class IsAdminOrReadOnly(BasePermission):
 class IsAuthorOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return request.method in SAFE_METHODS or obj.author == request.user
+
+
+def in_networks(address, networks):
+    return any(address in network for network in networks)
+
+
+def get_client_address(request):
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR'))
+        if in_networks(address, settings.METRICS_TRUSTED_PROXIES):
+            address = ipaddress.ip_address(
+                request.headers.get(settings.METRICS_CLIENT_IP_HEADER)
+            )
+    except ValueError:
+        return None
+    return address
+
+
+class IsStaffOrAllowedNetwork(BasePermission):
+    def has_permission(self, request, view):
+        if request.user.is_staff:
+            return True
+        address = get_client_address(request)
+        return address is not None and in_networks(
+            address, settings.METRICS_ALLOWED_NETWORKS
+        )
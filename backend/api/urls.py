@@ -0,0 +1,12 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import MetricsView, ProfilesViewSet
+
+router = DefaultRouter()
+router.register('profiles', ProfilesViewSet, basename='profiles')
+
+urlpatterns = [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,59 @@
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from rest_framework import viewsets
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import CONTENT_TYPE, collector, render_metrics
+from .permissions import IsStaffOrAllowedNetwork
+
+
+class ProfilesViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+    lookup_value_regex = r'[\w.-]+\.prof'
+
+    def list(self, request):
+        if not os.path.isdir(settings.PROFILING_PATH):
+            return Response([])
+        return Response([
+            {'name': entry.name, 'size': entry.stat().st_size}
+            for entry in sorted(
+                os.scandir(settings.PROFILING_PATH),
+                key=lambda entry: entry.name,
+                reverse=True
+            )
+            if entry.name.endswith('.prof')
+        ])
+
+    def retrieve(self, request, pk=None):
+        path = os.path.join(settings.PROFILING_PATH, os.path.basename(pk))
+        if not os.path.isfile(path):
+            raise Http404
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            content_type='application/octet-stream'
+        )
+
+
+class MetricsView(APIView):
+    permission_classes = (IsStaffOrAllowedNetwork,)
+
+    def permission_denied(self, request, message=None, code=None):
+        raise PermissionDenied(message, code)
+
+    def get(self, request):
+        requests, statements = collector.collect()
+        return HttpResponse(
+            render_metrics(
+                requests,
+                statements,
+                settings.METRICS_BUCKETS,
+                settings.METRICS_TOP_STATEMENTS
+            ),
+            content_type=CONTENT_TYPE
+        )
@@ -1,5 +1,6 @@
 import os
 import socket
+from ipaddress import ip_network
 from pathlib import Path
 from re import compile
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'django_filters',
@@ -37,6 +39,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -150,6 +153,11 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+DEFAULT_FILE_STORAGE = 'recipes.storage.ContentAddressedStorage'
+FILE_UPLOAD_HANDLERS = (
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+)
+UNUSED_IMAGES_MIN_AGE = 24 * 60 * 60
 STRING_LENGTH = 150
 STRING_MAX_LENGTH = 200
 EMAIL_MAX_LENGTH = 254
@@ -172,8 +180,63 @@ ALREADY_IN_FAVORITES_ERROR = 'Этот рецепт уже в избранном
 SAME_INGREDIENTS_ERROR = 'Ингредиенты не должны повторятся!'
 NO_TAGS_ERROR = 'У рецепта должен быть хотябы один тег!'
 SAME_TAGS_ERROR = 'Не должно быть одинаковых тегов!'
+INGREDIENTS_NOT_FOUND_ERROR = 'Не найдены ингредиенты: {ids}'
+TAGS_NOT_FOUND_ERROR = 'Не найдены теги: {ids}'
 RECIPE_IN_CART_ERROR = 'Этот рецепт уже в списке покупок!'
 NO_AUTHOR_SUBSCRIPTION = 'Нельзя отписаться от автора, не имея на него подписку.'
+INGREDIENT_INDEX_PATH = os.getenv('INGREDIENT_INDEX_PATH', default=os.path.join(BASE_DIR, 'index', 'ingredients.idx'))
+REFERENCE_DATA_VERSION_PATH = os.getenv('REFERENCE_DATA_VERSION_PATH', default=os.path.join(BASE_DIR, 'index', 'reference.version'))
+REFERENCE_DATA_MAX_AGE = 300
+REFERENCE_DATA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+RECIPE_IMAGE_VARIANTS = {
+    'card': 400,
+    'detail': 800,
+    'detail_2x': 1600,
+}
+RECIPE_IMAGE_FORMATS = ('webp', 'jpeg')
+RECIPE_IMAGE_QUALITY = 80
+RECIPE_IMAGE_MAX_SIDE = 2048
+RECIPE_IMAGE_MAX_PIXELS = 25_000_000
+RECIPE_IMAGE_TOO_LARGE_ERROR = f'Картинка слишком большая: допускается не более {RECIPE_IMAGE_MAX_PIXELS} пикселей.'
+RECIPE_IMAGE_WORKERS = int(os.getenv('RECIPE_IMAGE_WORKERS', default=2))
+INGREDIENT_SEARCH_LIMIT = 10
+INGREDIENT_SEARCH_MAX_LIMIT = 50
+INGREDIENT_SEARCH_SIMILARITY = 0.3
+IMPORT_BATCH_SIZE = 5000
+FAKE_DATA_BATCH_SIZE = 5000
+FAKE_DATA_IMAGE_SIZE = 64
+SHOPPING_LIST_TITLE = 'Список покупок'
+SHOPPING_LIST_CHUNK_SIZE = 2000
+SHOPPING_LIST_PDF_WORKERS = int(os.getenv('SHOPPING_LIST_PDF_WORKERS', default=2))
+SHOPPING_LIST_PDF_PATH = os.getenv('SHOPPING_LIST_PDF_PATH', default=os.path.join(BASE_DIR, 'shopping_lists'))
+SHOPPING_LIST_PDF_MAX_AGE = 60 * 60
+SHOPPING_LIST_PDF_RETRY_AFTER = 1
+SHOPPING_LIST_PDF_TIMEOUT = 2 * 60
+SHOPPING_LIST_PDF_PENDING = 'Список покупок готовится, повторите запрос позже.'
+SHOPPING_LIST_PDF_NOT_FOUND = 'Список покупок не найден.'
+SHOPPING_LIST_PDF_FAILED = 'Не удалось подготовить список покупок, запросите его заново.'
+SHOPPING_LIST_PDF_FONT = os.getenv('SHOPPING_LIST_PDF_FONT', default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+SHOPPING_LIST_PDF_FONT_SIZE = 12
+SHOPPING_LIST_PDF_MARGIN = 50
+PROFILING_PATH = os.getenv('PROFILING_PATH', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', default=0))
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', default='')
+PROFILING_HEADER = 'X-Profile'
+PROFILING_RESULT_HEADER = 'X-Profile-Id'
+PROFILING_MAX_FILES = 200
+METRICS_PATH = os.getenv('METRICS_PATH', default=os.path.join(BASE_DIR, 'metrics'))
+METRICS_ALLOWED_NETWORKS = [
+    ip_network(network)
+    for network in os.getenv('METRICS_ALLOWED_NETWORKS', default='127.0.0.1/32').split()
+]
+METRICS_TRUSTED_PROXIES = [
+    ip_network(network)
+    for network in os.getenv('METRICS_TRUSTED_PROXIES', default='').split()
+]
+METRICS_CLIENT_IP_HEADER = 'X-Real-IP'
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOP_STATEMENTS = 50
 
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -6,7 +6,8 @@ from django.urls import include, path
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('users.urls')),
-    path('api/', include('recipes.urls'))
+    path('api/', include('recipes.urls')),
+    path('api/', include('api.urls'))
 ]
 
 if settings.DEBUG:
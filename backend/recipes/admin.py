@@ -1,20 +1,31 @@
 from django.contrib import admin
 
+from users.admin_filters import (AuthorFilter, AutocompleteFilterMixin,
+                                 InputFilter, UserFilter)
 from users.mixins import EmptyFieldMixin
 
 from .models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
-                     ShoppingCart, Tag, TagInRecipe)
+                     ShoppingCart, Tag)
+from .shopping_list import get_recipe_amounts, update_recipe_in_shopping_lists
 
 
 class IngredientInRecipeInline(admin.TabularInline):
     model = IngredientInRecipe
     extra = 1
     min_num = 1
+    autocomplete_fields = ('ingredient',)
 
 
 class TagInRecipeInLine(admin.TabularInline):
-    model = TagInRecipe
+    model = Recipe.tags.through
     extra = 1
+    autocomplete_fields = ('tag',)
+
+
+class RecipeNameFilter(InputFilter):
+    title = 'Название'
+    parameter_name = 'name'
+    lookup = 'name__istartswith'
 
 
 @admin.register(Ingredient)
@@ -32,7 +43,7 @@ class TagAdmin(EmptyFieldMixin, admin.ModelAdmin):
 
 
 @admin.register(Recipe)
-class RecipeAdmin(EmptyFieldMixin, admin.ModelAdmin):
+class RecipeAdmin(AutocompleteFilterMixin, EmptyFieldMixin):
     list_display = (
         'id',
         'author',
@@ -40,28 +51,43 @@ class RecipeAdmin(EmptyFieldMixin, admin.ModelAdmin):
         'text',
         'cooking_time',
         'pub_date',
-        'count_favorite'
+        'favorites_count'
     )
+    list_select_related = ('author',)
     search_fields = ('author__username', 'name',)
-    list_filter = ('name', 'author', 'tags',)
-    readonly_fields = ('count_favorite',)
+    list_filter = (RecipeNameFilter, AuthorFilter, 'tags')
+    readonly_fields = ('favorites_count',)
+    autocomplete_fields = ('author',)
     inlines = (IngredientInRecipeInline, TagInRecipeInLine)
     exclude = ('tags', 'ingredients')
+    show_full_result_count = False
 
-    @staticmethod
-    def count_favorite(obj):
-        return obj.favorite_recipe.count()
+    def save_related(self, request, form, formsets, change):
+        old_amounts = get_recipe_amounts(form.instance.id) if change else {}
+        super().save_related(request, form, formsets, change)
+        if change:
+            update_recipe_in_shopping_lists(
+                form.instance,
+                old_amounts,
+                get_recipe_amounts(form.instance.id)
+            )
 
 
 @admin.register(Favorites)
-class FavoriteAdmin(EmptyFieldMixin, admin.ModelAdmin):
+class FavoriteAdmin(AutocompleteFilterMixin, EmptyFieldMixin):
     list_display = ('user', 'recipe',)
-    search_fields = ('user',)
-    list_filter = ('user',)
+    list_select_related = ('user', 'recipe')
+    search_fields = ('user__username', 'user__email', 'recipe__name')
+    list_filter = (UserFilter,)
+    autocomplete_fields = ('user', 'recipe')
+    show_full_result_count = False
 
 
 @admin.register(ShoppingCart)
-class ShoppingCartAdmin(EmptyFieldMixin, admin.ModelAdmin):
+class ShoppingCartAdmin(AutocompleteFilterMixin, EmptyFieldMixin):
     list_display = ('user', 'recipe',)
-    search_fields = ('user',)
-    list_filter = ('user',)
+    list_select_related = ('user', 'recipe')
+    search_fields = ('user__username', 'user__email', 'recipe__name')
+    list_filter = (UserFilter,)
+    autocomplete_fields = ('user', 'recipe')
+    show_full_result_count = False
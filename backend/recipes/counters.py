@@ -0,0 +1,88 @@
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import (Count, F, IntegerField, OuterRef, Subquery,
+                              Value)
+from django.db.models.functions import Coalesce
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ),
+        Value(0)
+    )
+
+
+def recount(recipe_model, user_model, favorites_model, subscription_model):
+    return (
+        recipe_model.objects.update(
+            favorites_count=count_related(favorites_model, 'recipe')
+        ),
+        user_model.objects.update(
+            recipes_count=count_related(recipe_model, 'author'),
+            followers_count=count_related(subscription_model, 'author'),
+        ),
+    )
+
+
+class PendingRecounts:
+    def __init__(self):
+        self.counters = defaultdict(set)
+        self.deleted = defaultdict(set)
+
+    def run(self):
+        for (model, field, related, related_field), pks in (
+            self.counters.items()
+        ):
+            pks = pks - self.deleted[model]
+            if pks:
+                model.objects.filter(pk__in=pks).update(
+                    **{field: count_related(related, related_field)}
+                )
+
+
+def get_pending_recounts():
+    return getattr(transaction.get_connection(), 'pending_recounts', None)
+
+
+@contextmanager
+def recount_after_delete():
+    connection = transaction.get_connection()
+    if getattr(connection, 'pending_recounts', None) is not None:
+        yield
+        return
+    connection.pending_recounts = pending = PendingRecounts()
+    try:
+        with transaction.atomic(savepoint=False):
+            yield
+            pending.run()
+    finally:
+        connection.pending_recounts = None
+
+
+def lock_deleted_row(sender, instance, **kwargs):
+    if get_pending_recounts() is not None:
+        return
+    instance.counter_row_exists = sender.objects.select_for_update().filter(
+        pk=instance.pk
+    ).exists()
+
+
+def decrement(sender, instance, model, field, related_field):
+    pk = getattr(instance, f'{related_field}_id')
+    pending = get_pending_recounts()
+    if pending is not None:
+        pending.deleted[sender].add(instance.pk)
+        pending.counters[model, field, sender, related_field].add(pk)
+    elif getattr(instance, 'counter_row_exists', False):
+        model.objects.filter(pk=pk, **{f'{field}__gt': 0}).update(
+            **{field: F(field) - 1}
+        )
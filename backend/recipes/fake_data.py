@@ -0,0 +1,245 @@
+import random
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import accumulate, product, repeat
+from multiprocessing import current_process, get_context
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import connection, connections, transaction
+from PIL import Image
+
+from users.models import Subscription
+
+from .counters import recount
+from .importer import batched, execute_batch, get_upsert_sql
+from .models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingCart, Tag)
+from .shopping_list import rebuild_shopping_lists
+
+User = get_user_model()
+
+FAKE_PASSWORD = 'fake-password-1'
+FAKE_MAX_AMOUNT = 500
+PAIR_ROUNDS = 20
+PAIR_OVERSAMPLING = 2
+
+
+class ZipfSampler:
+    def __init__(self, rng, population, exponent):
+        self.rng = rng
+        self.population = list(population)
+        rng.shuffle(self.population)
+        self.cum_weights = list(accumulate(
+            1 / rank ** exponent
+            for rank in range(1, len(self.population) + 1)
+        ))
+
+    def sample(self, count):
+        return self.rng.choices(
+            self.population, cum_weights=self.cum_weights, k=count
+        )
+
+    def sample_unique(self, count):
+        count = min(count, len(self.population))
+        chosen = dict.fromkeys(self.sample(count))
+        while len(chosen) < count:
+            chosen.update(dict.fromkeys(self.sample(count - len(chosen))))
+        return list(chosen)
+
+
+def bulk_insert(model, objects, batch_size):
+    for batch in batched(objects, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+
+
+def bulk_create_ids(model, objects, batch_size):
+    last_id = model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+    bulk_insert(model, objects, batch_size)
+    return list(
+        model.objects.filter(pk__gt=last_id).order_by('pk').values_list(
+            'pk', flat=True
+        )
+    )
+
+
+def add_pairs(pairs, candidates, count, exclude_same):
+    for pair in candidates:
+        if exclude_same and pair[0] == pair[1]:
+            continue
+        pairs.add(pair)
+        if len(pairs) == count:
+            return
+
+
+def sample_pairs(left, right, count, exclude_same=False):
+    limit = len(left.population) * len(right.population)
+    if exclude_same:
+        limit -= len(set(left.population) & set(right.population))
+    count = min(count, limit)
+    pairs = set()
+    for _ in range(PAIR_ROUNDS):
+        missing = count - len(pairs)
+        if not missing:
+            break
+        add_pairs(pairs, zip(
+            left.sample(missing * PAIR_OVERSAMPLING),
+            right.sample(missing * PAIR_OVERSAMPLING)
+        ), count, exclude_same)
+    if len(pairs) < count:
+        add_pairs(
+            pairs,
+            product(left.population, right.population),
+            count,
+            exclude_same
+        )
+    return sorted(pairs)
+
+
+def get_next_user_number(prefix):
+    pattern = re.compile(rf'{re.escape(prefix)}(\d+)')
+    numbers = (
+        int(match.group(1))
+        for match in map(pattern.fullmatch, User.objects.filter(
+            username__startswith=prefix
+        ).values_list('username', flat=True).iterator())
+        if match
+    )
+    return max(numbers, default=-1) + 1
+
+
+def insert_rows(sql, rows, batch_size):
+    try:
+        created = 0
+        for batch in batched(rows, batch_size):
+            execute_batch(sql, batch)
+            created += len(batch)
+        return created
+    finally:
+        if current_process().name != 'MainProcess':
+            connection.close()
+
+
+def insert_links(model, fields, rows, batch_size, processes=1):
+    sql = get_upsert_sql(model, fields, None, update=False)
+    if processes < 2 or connection.vendor == 'sqlite':
+        return insert_rows(sql, rows, batch_size)
+    rows = list(rows)
+    chunk = -(-len(rows) // processes)
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=get_context('fork')
+    ) as executor:
+        return sum(executor.map(
+            insert_rows,
+            repeat(sql),
+            (rows[start:start + chunk] for start in range(
+                0, len(rows), chunk
+            )),
+            repeat(batch_size)
+        ))
+
+
+def create_placeholder_images(rng, count):
+    storage = Recipe.image.field.storage
+    names = []
+    for number in range(count):
+        buffer = BytesIO()
+        Image.new(
+            'RGB',
+            (settings.FAKE_DATA_IMAGE_SIZE, settings.FAKE_DATA_IMAGE_SIZE),
+            tuple(rng.randrange(256) for _ in range(3))
+        ).save(buffer, format='JPEG', quality=settings.RECIPE_IMAGE_QUALITY)
+        names.append(storage.save(
+            f'{Recipe.image.field.upload_to}fake{number}.jpg',
+            ContentFile(buffer.getvalue())
+        ))
+    return names
+
+
+def create_fake_data(
+    users, recipes, favorites, shopping_carts, subscriptions,
+    seed=0, prefix='fake', zipf=1.1, images=8,
+    batch_size=settings.FAKE_DATA_BATCH_SIZE, processes=1, report=None,
+    warn=None
+):
+    report = report or (lambda stage, count: None)
+    warn = warn or (lambda message: None)
+    rng = random.Random(seed)
+    tag_ids = list(Tag.objects.values_list('id', flat=True))
+    ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+    if not tag_ids or not ingredient_ids:
+        raise ValueError('Сначала загрузите теги и ингредиенты')
+    image_names = create_placeholder_images(rng, max(images, 1))
+    password = make_password(FAKE_PASSWORD)
+    start = get_next_user_number(prefix)
+    user_ids = bulk_create_ids(User, (
+        User(
+            username=f'{prefix}{number}',
+            email=f'{prefix}{number}@example.com',
+            first_name=prefix,
+            last_name=str(number),
+            password=password
+        )
+        for number in range(start, start + users)
+    ), batch_size)
+    report('users', len(user_ids))
+    authors = ZipfSampler(rng, user_ids, zipf)
+    recipe_ids = bulk_create_ids(Recipe, (
+        Recipe(
+            author_id=author_id,
+            name=f'{prefix} recipe {number}',
+            text=f'{prefix} recipe {number}',
+            image=rng.choice(image_names),
+            cooking_time=max(
+                settings.MIN_COOKING_TIME, int(rng.lognormvariate(3.4, 0.6))
+            )
+        )
+        for number, author_id in enumerate(authors.sample(recipes))
+    ), batch_size)
+    report('recipes', len(recipe_ids))
+    tags = ZipfSampler(rng, tag_ids, zipf)
+    insert_links(Recipe.tags.through, ('recipe', 'tag'), (
+        (recipe_id, tag_id)
+        for recipe_id in recipe_ids
+        for tag_id in tags.sample_unique(rng.randint(1, len(tag_ids)))
+    ), batch_size)
+    ingredients = ZipfSampler(rng, ingredient_ids, zipf)
+    report('ingredients', insert_links(
+        IngredientInRecipe, ('recipe', 'ingredient', 'amount'), (
+            (recipe_id, ingredient_id, rng.randint(
+                settings.MIN_AMOUNT_VALUE, FAKE_MAX_AMOUNT
+            ))
+            for recipe_id in recipe_ids
+            for ingredient_id in ingredients.sample_unique(
+                round(rng.triangular(3, 15, 7))
+            )
+        ), batch_size
+    ))
+    active_users = ZipfSampler(rng, user_ids, zipf)
+    popular_recipes = ZipfSampler(rng, recipe_ids, zipf)
+    for model, fields, right, count, exclude_same in (
+        (Favorites, ('user', 'recipe'), popular_recipes, favorites, False),
+        (ShoppingCart, ('user', 'recipe'), popular_recipes, shopping_carts,
+         False),
+        (Subscription, ('user', 'author'), authors, subscriptions, True),
+    ):
+        pairs = sample_pairs(active_users, right, count, exclude_same)
+        if len(pairs) < count:
+            warn(
+                f'{model._meta.model_name}: уникальных пар только '
+                f'{len(pairs)} из {count}'
+            )
+        report(model._meta.model_name, insert_links(
+            model, fields, pairs, batch_size, processes
+        ))
+    recount(Recipe, User, Favorites, Subscription)
+    rebuild_shopping_lists()
+    report('counters', len(recipe_ids))
+    return user_ids, recipe_ids
@@ -0,0 +1,118 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import connection
+from PIL import Image, ImageOps
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+image_executor = ThreadPoolExecutor(
+    max_workers=settings.RECIPE_IMAGE_WORKERS,
+    thread_name_prefix='recipe-images'
+)
+
+
+def get_variant_name(name, variant, image_format):
+    stem, _ = os.path.splitext(name)
+    return f'{stem}_{variant}.{image_format}'
+
+
+def encode_variant(image, image_format):
+    if image_format == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=image_format,
+        quality=settings.RECIPE_IMAGE_QUALITY,
+        optimize=True
+    )
+    return buffer.getvalue()
+
+
+def has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+
+
+def normalize_image(file):
+    max_size = (settings.RECIPE_IMAGE_MAX_SIDE, settings.RECIPE_IMAGE_MAX_SIDE)
+    file.seek(0)
+    try:
+        image = Image.open(file)
+    except Image.DecompressionBombError:
+        raise ValidationError(settings.RECIPE_IMAGE_TOO_LARGE_ERROR)
+    with image:
+        image.draft('RGB', max_size)
+        if image.width * image.height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            raise ValidationError(settings.RECIPE_IMAGE_TOO_LARGE_ERROR)
+        image.thumbnail(max_size)
+        image = ImageOps.exif_transpose(image)
+    mode, image_format, extension = (
+        ('RGBA', 'png', 'png') if has_alpha(image) else ('RGB', 'jpeg', 'jpg')
+    )
+    if image.mode != mode:
+        image = image.convert(mode)
+    image.info.clear()
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=image_format,
+        quality=settings.RECIPE_IMAGE_QUALITY,
+        optimize=True
+    )
+    stem, _ = os.path.splitext(os.path.basename(file.name or 'image'))
+    return ContentFile(buffer.getvalue(), name=f'{stem}.{extension}')
+
+
+def generate_image_variants(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).only('image').first()
+    if recipe is None or not recipe.image:
+        return None
+    storage = recipe.image.storage
+    name = recipe.image.name
+    with storage.open(name) as file, Image.open(file) as original:
+        original.load()
+    variants = {'source': name}
+    for variant, width in settings.RECIPE_IMAGE_VARIANTS.items():
+        image = original.copy()
+        image.thumbnail((width, original.height))
+        variants[variant] = {}
+        for image_format in settings.RECIPE_IMAGE_FORMATS:
+            variants[variant][image_format] = storage.save(
+                get_variant_name(name, variant, image_format),
+                ContentFile(encode_variant(image, image_format))
+            )
+    Recipe.objects.filter(pk=recipe_id, image=name).update(
+        image_variants=variants
+    )
+    return variants
+
+
+def generate_image_variants_in_background(recipe_id):
+    def task():
+        try:
+            generate_image_variants(recipe_id)
+        finally:
+            connection.close()
+
+    def log_failure(future):
+        if future.exception() is not None:
+            logger.error(
+                'Не удалось подготовить варианты изображения рецепта %s',
+                recipe_id, exc_info=future.exception()
+            )
+
+    future = image_executor.submit(task)
+    future.add_done_callback(log_failure)
+    return future
@@ -0,0 +1,204 @@
+import csv
+import json
+import os
+import re
+import time
+from itertools import islice
+
+from django.db import connection, transaction
+from psycopg2.extras import execute_values
+
+from .models import Ingredient, Tag
+
+IMPORT_MODELS = {
+    'ingredients': (Ingredient, ('name', 'measurement_unit'), 'name'),
+    'tags': (Tag, ('name', 'color', 'slug'), 'slug'),
+}
+FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+JSON_CHUNK_SIZE = 64 * 1024
+JSON_SEPARATORS = re.compile(r'[\s,]*')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def get_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ImportFormatError(f'Неизвестный формат файла {path}')
+    return FORMATS[extension]
+
+
+def get_model_key(path):
+    stem = os.path.splitext(os.path.basename(path))[0].lower()
+    for key in IMPORT_MODELS:
+        if stem.startswith(key):
+            return key
+    raise ImportFormatError(f'Не удалось определить данные файла {path}')
+
+
+def read_csv(file, fields):
+    for line_number, row in enumerate(csv.reader(file), start=1):
+        if line_number == 1 and tuple(row) == fields:
+            continue
+        if not row:
+            continue
+        if len(row) != len(fields):
+            raise ImportFormatError(
+                f'Строка {line_number}: ожидалось полей {len(fields)}, '
+                f'получено {len(row)}'
+            )
+        yield dict(zip(fields, row))
+
+
+def read_ndjson(file, fields):
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            yield get_fields(json.loads(line), fields, line_number)
+
+
+def read_json(file, fields):
+    decoder = json.JSONDecoder()
+    buffer = file.read(JSON_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ImportFormatError('JSON-файл должен содержать массив объектов')
+    position = 1
+    number = 0
+    finished = False
+    while True:
+        position = JSON_SEPARATORS.match(buffer, position).end()
+        if buffer[position:position + 1] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if finished:
+                raise
+            chunk = file.read(JSON_CHUNK_SIZE)
+            finished = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        number += 1
+        yield get_fields(item, fields, number)
+        position = end
+
+
+def get_fields(item, fields, number):
+    try:
+        return {field: item[field] for field in fields}
+    except (KeyError, TypeError):
+        raise ImportFormatError(
+            f'Запись {number}: ожидались поля {", ".join(fields)}'
+        )
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+    'ndjson': read_ndjson,
+}
+
+
+def read_rows(path, fields, file_format=None):
+    reader = READERS[file_format or get_format(path)]
+    with open(path, encoding='utf-8', newline='') as file:
+        yield from reader(file, fields)
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def get_upsert_sql(model, fields, key, update):
+    quote = connection.ops.quote_name
+    columns = [quote(model._meta.get_field(field).column) for field in fields]
+    if update:
+        key_column = quote(model._meta.get_field(key).column)
+        conflict = f'({key_column}) DO UPDATE SET ' + ', '.join(
+            f'{column} = EXCLUDED.{column}'
+            for column in columns if column != key_column
+        )
+    else:
+        conflict = 'DO NOTHING'
+    values = '%s' if connection.vendor == 'postgresql' else (
+        '(' + ', '.join(['%s'] * len(columns)) + ')'
+    )
+    return (
+        f'INSERT INTO {quote(model._meta.db_table)} ({", ".join(columns)}) '
+        f'VALUES {values} ON CONFLICT {conflict}'
+    )
+
+
+def execute_batch(sql, rows):
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor != 'postgresql':
+            cursor.executemany(sql, rows)
+            return
+        execute_values(cursor.cursor, sql, rows, page_size=len(rows))
+
+
+def get_unique_fields(model, fields, key):
+    return [
+        field for field in fields
+        if field != key and model._meta.get_field(field).unique
+    ]
+
+
+def drop_conflicts(model, key, unique_fields, rows):
+    conflicts = []
+    for field in unique_fields:
+        owners = dict(
+            model.objects.filter(
+                **{f'{field}__in': [row[field] for row in rows.values()]}
+            ).values_list(field, key)
+        )
+        claimed = {}
+        for row_key, row in list(rows.items()):
+            value = row[field]
+            owner = owners.get(value, claimed.get(value, row_key))
+            if owner != row_key:
+                conflicts.append((row_key, field, value))
+                del rows[row_key]
+            else:
+                claimed[value] = row_key
+    return conflicts
+
+
+def get_batch_rows(fields, key, batch):
+    return {
+        str(row[key]): {field: str(row[field]) for field in fields}
+        for row in batch
+    }
+
+
+def save_batch(sql, fields, rows):
+    if rows:
+        execute_batch(sql, [
+            tuple(row[field] for field in fields) for row in rows.values()
+        ])
+
+
+def import_rows(model_key, rows, batch_size, update=False):
+    model, fields, key = IMPORT_MODELS[model_key]
+    sql = get_upsert_sql(model, fields, key, update)
+    unique_fields = get_unique_fields(model, fields, key) if update else ()
+    started = time.perf_counter()
+    processed = 0
+    for batch in batched(rows, batch_size):
+        batch_rows = get_batch_rows(fields, key, batch)
+        conflicts = drop_conflicts(model, key, unique_fields, batch_rows)
+        save_batch(sql, fields, batch_rows)
+        processed += len(batch)
+        yield processed, time.perf_counter() - started, conflicts
@@ -0,0 +1,166 @@
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import Ingredient
+
+HEADER = struct.Struct('<4sII')
+OFFSET = struct.Struct('<I')
+MAGIC = b'FGII'
+VERSION = 1
+SEPARATOR = '\x1f'
+
+
+def normalize(value):
+    return value.strip().casefold().replace('ё', 'е')
+
+
+def build_ingredient_index(path=None):
+    path = path or settings.INGREDIENT_INDEX_PATH
+    records = sorted(
+        SEPARATOR.join(
+            (normalize(name), str(pk), name, measurement_unit)
+        ).encode('utf-8')
+        for pk, name, measurement_unit in Ingredient.objects.values_list(
+            'id', 'name', 'measurement_unit'
+        ).iterator()
+    )
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        file.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        file.writelines(records)
+    os.replace(temp_path, path)
+    return len(records)
+
+
+class Records:
+    def __init__(self, buffer, count):
+        self.buffer = buffer
+        self.count = count
+        self.data_start = HEADER.size + OFFSET.size * (count + 1)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start, end = struct.unpack_from(
+            '<2I', self.buffer, HEADER.size + OFFSET.size * index
+        )
+        return self.buffer[self.data_start + start:self.data_start + end]
+
+    def key(self, index):
+        record = self[index]
+        return record[:record.index(SEPARATOR.encode('utf-8'))]
+
+
+class Keys:
+    def __init__(self, records):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records.key(index)
+
+
+class IngredientIndex:
+    def __init__(self, path=None):
+        self.default_path = path
+        self.lock = threading.Lock()
+        self.signature = None
+        self.buffer = None
+        self.records = None
+
+    @property
+    def path(self):
+        return self.default_path or settings.INGREDIENT_INDEX_PATH
+
+    def load(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return True
+        with self.lock:
+            if signature == self.signature:
+                return True
+            with open(self.path, 'rb') as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count = HEADER.unpack_from(buffer)
+            if magic != MAGIC or version != VERSION:
+                buffer.close()
+                return False
+            old_buffer = self.buffer
+            self.records = Records(buffer, count)
+            self.buffer = buffer
+            self.signature = signature
+            if old_buffer is not None:
+                old_buffer.close()
+        return True
+
+    @staticmethod
+    def entries(records, start=0):
+        for index in range(start, len(records)):
+            key, pk, name, measurement_unit = (
+                records[index].decode('utf-8').split(SEPARATOR)
+            )
+            yield key, {
+                'id': int(pk),
+                'name': name,
+                'measurement_unit': measurement_unit,
+            }
+
+    def find(self, records, prefix):
+        start = bisect_left(Keys(records), prefix.encode('utf-8'))
+        result = []
+        for key, ingredient in self.entries(records, start):
+            if not key.startswith(prefix):
+                break
+            result.append(ingredient)
+        return result
+
+    def read(self, reader):
+        while True:
+            records = self.records
+            try:
+                return reader(records)
+            except ValueError:
+                if records is self.records:
+                    raise
+
+    def search(self, prefix):
+        if not self.load():
+            return None
+        prefix = normalize(prefix)
+        return self.read(lambda records: self.find(records, prefix))
+
+
+ingredient_index = IngredientIndex()
+
+
+def ensure_ingredient_index():
+    if ingredient_index.load():
+        return True
+    try:
+        build_ingredient_index()
+    except OSError:
+        return False
+    return ingredient_index.load()
+
+
+def search_ingredients(prefix):
+    if not ensure_ingredient_index():
+        return None
+    return ingredient_index.search(prefix)
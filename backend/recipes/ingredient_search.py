@@ -0,0 +1,164 @@
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import (CharField, Case, Func, IntegerField, Q, Value,
+                              When)
+from django.db.models.functions import Lower
+
+from .ingredient_index import (ensure_ingredient_index, ingredient_index,
+                               normalize)
+from .models import Ingredient
+
+WORD_PATTERN = re.compile(r'\w+')
+PREFIX_RANK = 0
+INFIX_RANK = 1
+FUZZY_RANK = 2
+
+
+def get_trigrams(value):
+    trigrams = set()
+    for word in WORD_PATTERN.findall(value):
+        word = f'  {word} '
+        trigrams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return trigrams
+
+
+def get_similarity(trigrams, other_trigrams, shared=None):
+    if shared is None:
+        shared = len(trigrams & other_trigrams)
+    total = len(trigrams) + len(other_trigrams) - shared
+    return shared / total if total else 0
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.signature = None
+        self.entries = ()
+        self.trigrams = ()
+        self.postings = {}
+
+    def load(self):
+        if not ensure_ingredient_index():
+            return False
+        if ingredient_index.signature == self.signature:
+            return True
+        with self.lock:
+            signature = ingredient_index.signature
+            if signature == self.signature:
+                return True
+            entries = ingredient_index.read(
+                lambda records: list(ingredient_index.entries(records))
+            )
+            trigrams = [get_trigrams(key) for key, _ in entries]
+            postings = defaultdict(list)
+            for position, entry_trigrams in enumerate(trigrams):
+                for trigram in entry_trigrams:
+                    postings[trigram].append(position)
+            self.entries = entries
+            self.trigrams = trigrams
+            self.postings = dict(postings)
+            self.signature = signature
+        return True
+
+    def search(self, query, limit):
+        if not self.load():
+            return None
+        entries, trigrams = self.entries, self.trigrams
+        query = normalize(query)
+        query_trigrams = get_trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.postings.get(trigram, ()))
+        ranked = {}
+        for position, (key, _) in enumerate(entries):
+            if key.startswith(query):
+                ranked[position] = PREFIX_RANK
+            elif query in key:
+                ranked[position] = INFIX_RANK
+        for position, count in shared.items():
+            if position not in ranked and get_similarity(
+                query_trigrams, trigrams[position], count
+            ) >= settings.INGREDIENT_SEARCH_SIMILARITY:
+                ranked[position] = FUZZY_RANK
+        result = sorted(
+            ranked,
+            key=lambda position: (
+                ranked[position],
+                -get_similarity(
+                    query_trigrams,
+                    trigrams[position],
+                    shared.get(position, 0)
+                ),
+                entries[position][0],
+            )
+        )
+        return [entries[position][1] for position in result[:limit]]
+
+
+trigram_index = TrigramIndex()
+
+
+def get_normalized_name():
+    return Func(
+        Lower('name'),
+        Value('Ёё'),
+        Value('ее'),
+        function='TRANSLATE',
+        output_field=CharField()
+    )
+
+
+def search_ingredients_in_database(query, limit):
+    if connection.vendor == 'postgresql':
+        query = normalize(query)
+        return list(
+            Ingredient.objects.annotate(
+                normalized_name=get_normalized_name()
+            ).filter(
+                Q(normalized_name__contains=query)
+                | Q(normalized_name__trigram_similar=query)
+            ).annotate(
+                rank=Case(
+                    When(
+                        normalized_name__startswith=query,
+                        then=Value(PREFIX_RANK)
+                    ),
+                    When(
+                        normalized_name__contains=query,
+                        then=Value(INFIX_RANK)
+                    ),
+                    default=Value(FUZZY_RANK),
+                    output_field=IntegerField()
+                ),
+                similarity=TrigramSimilarity('normalized_name', query)
+            ).order_by(
+                'rank', '-similarity', 'name'
+            ).values('id', 'name', 'measurement_unit')[:limit]
+        )
+    return list(
+        Ingredient.objects.filter(
+            name__icontains=query
+        ).annotate(
+            rank=Case(
+                When(name__istartswith=query, then=Value(PREFIX_RANK)),
+                When(name__icontains=query, then=Value(INFIX_RANK)),
+                default=Value(FUZZY_RANK),
+                output_field=IntegerField()
+            )
+        ).order_by(
+            'rank', 'name'
+        ).values('id', 'name', 'measurement_unit')[:limit]
+    )
+
+
+def search_ingredients_ranked(query, limit):
+    if connection.vendor != 'postgresql':
+        result = trigram_index.search(query, limit)
+        if result is not None:
+            return result
+    return search_ingredients_in_database(query, limit)
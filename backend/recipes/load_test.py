@@ -0,0 +1,323 @@
+import asyncio
+import base64
+import json
+import math
+import random
+import ssl
+import time
+from collections import defaultdict
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+
+from PIL import Image
+
+PERCENTILES = (50, 95, 99)
+RECIPE_NAME = 'load test'
+PAGE_SIZE = 6
+
+
+class LoadTestError(Exception):
+    pass
+
+
+def make_image():
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), 'orange').save(buffer, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode('ascii')
+
+
+def percentile(values, percent):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[max(math.ceil(len(values) * percent / 100) - 1, 0)]
+
+
+class Connection:
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.netloc = parts.netloc
+        self.ssl = ssl.create_default_context() if (
+            parts.scheme == 'https'
+        ) else None
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl
+        )
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, method, path, token=None, payload=None):
+        body = b'' if payload is None else json.dumps(payload).encode()
+        headers = {
+            'Host': self.netloc,
+            'Accept': 'application/json',
+            'Connection': 'keep-alive',
+            'Content-Length': str(len(body)),
+        }
+        if payload is not None:
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        request = f'{method} {path} HTTP/1.1\r\n' + ''.join(
+            f'{name}: {value}\r\n' for name, value in headers.items()
+        ) + '\r\n'
+        for attempt in range(2):
+            if self.writer is None:
+                await self.connect()
+            try:
+                self.writer.write(request.encode('latin-1') + body)
+                return await asyncio.wait_for(
+                    self.read_response(), self.timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if attempt:
+                    raise
+        return None
+
+    async def read_response(self):
+        status_line = await self.reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, value = line.decode('latin-1').split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(
+                int(headers['content-length'])
+            )
+        elif headers.get('transfer-encoding') == 'chunked':
+            body = await self.read_chunked()
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, headers.get('content-type', ''), body
+
+    async def read_chunked(self):
+        chunks = []
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            size = int(line.split(b';')[0], 16)
+            chunk = await self.reader.readexactly(size + 2)
+            if not size:
+                return b''.join(chunks)
+            chunks.append(chunk[:-2])
+
+
+class Session:
+    def __init__(self, connection, stats, account, rng, context):
+        self.connection = connection
+        self.stats = stats
+        self.account = account
+        self.rng = rng
+        self.context = context
+        self.token = None
+
+    async def call(self, name, method, path, expected, payload=None):
+        started = time.perf_counter()
+        try:
+            status, content_type, body = await self.connection.request(
+                method, path, self.token, payload
+            )
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                ValueError):
+            self.connection.close()
+            self.stats.add(name, time.perf_counter() - started, False)
+            return None
+        self.stats.add(
+            name, time.perf_counter() - started, status == expected
+        )
+        if status != expected or 'json' not in content_type or not body:
+            return None
+        return json.loads(body)
+
+    async def run(self):
+        login = await self.call(
+            'token_login', 'POST', '/api/auth/token/login/', 200,
+            self.account
+        )
+        if login is None:
+            return
+        self.token = login['auth_token']
+        query = {'limit': PAGE_SIZE}
+        if self.rng.random() < 0.5:
+            query['tags'] = self.rng.sample(
+                self.context['tags'],
+                self.rng.randint(1, len(self.context['tags']))
+            )
+        page = await self.call(
+            'recipes', 'GET', '/api/recipes/?' + urlencode(query, True), 200
+        )
+        recipes = [
+            recipe for recipe in (page['results'] if page else [])
+            if recipe['name'] != RECIPE_NAME
+        ]
+        for recipe in self.rng.sample(recipes, min(len(recipes), 3)):
+            await self.call(
+                'recipe', 'GET', f'/api/recipes/{recipe["id"]}/', 200
+            )
+            for flag, action in (
+                ('is_favorited', 'favorite'),
+                ('is_in_shopping_cart', 'shopping_cart'),
+            ):
+                await self.call(
+                    f'{action}_remove' if recipe[flag] else f'{action}_add',
+                    'DELETE' if recipe[flag] else 'POST',
+                    f'/api/recipes/{recipe["id"]}/{action}/',
+                    204 if recipe[flag] else 201
+                )
+        await self.call(
+            'shopping_cart_download', 'GET',
+            '/api/recipes/download_shopping_cart/', 200
+        )
+        await self.call(
+            'subscriptions', 'GET',
+            '/api/users/subscriptions/?recipes_limit=3', 200
+        )
+        if self.rng.random() < self.context['create_ratio']:
+            await self.create_recipe()
+        await self.call(
+            'token_logout', 'POST', '/api/auth/token/logout/', 204
+        )
+
+    async def create_recipe(self):
+        recipe = await self.call(
+            'recipe_create', 'POST', '/api/recipes/', 201, {
+                'ingredients': [
+                    {'id': ingredient, 'amount': self.rng.randint(1, 500)}
+                    for ingredient in self.rng.sample(
+                        self.context['ingredients'],
+                        min(len(self.context['ingredients']), 5)
+                    )
+                ],
+                'tags': [self.rng.choice(self.context['tag_ids'])],
+                'image': self.context['image'],
+                'name': RECIPE_NAME,
+                'text': RECIPE_NAME,
+                'cooking_time': self.rng.randint(1, 120),
+            }
+        )
+        if recipe is not None:
+            await self.call(
+                'recipe_delete', 'DELETE', f'/api/recipes/{recipe["id"]}/',
+                204
+            )
+
+
+class Stats:
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, name, seconds, ok):
+        self.timings[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self, elapsed):
+        return {
+            name: {
+                'requests': len(timings),
+                'errors': self.errors[name],
+                'rps': round(len(timings) / elapsed, 2),
+                **{
+                    f'p{percent}_ms': round(
+                        percentile(timings, percent) * 1000, 2
+                    )
+                    for percent in PERCENTILES
+                },
+            }
+            for name, timings in sorted(self.timings.items())
+        }
+
+
+async def load_context(url, timeout, create_ratio):
+    connection = Connection(url, timeout)
+    try:
+        _, _, body = await connection.request('GET', '/api/tags/')
+        tags = json.loads(body)
+        _, _, body = await connection.request('GET', '/api/ingredients/')
+        ingredients = json.loads(body)
+    except (OSError, ValueError, asyncio.TimeoutError) as error:
+        raise LoadTestError(f'Сервер {url} недоступен: {error}')
+    finally:
+        connection.close()
+    if not tags or not ingredients:
+        raise LoadTestError('На сервере нет тегов или ингредиентов')
+    return {
+        'tags': [tag['slug'] for tag in tags],
+        'tag_ids': [tag['id'] for tag in tags],
+        'ingredients': [ingredient['id'] for ingredient in ingredients],
+        'image': make_image(),
+        'create_ratio': create_ratio,
+    }
+
+
+async def run_worker(number, url, accounts, context, stats, options):
+    rng = random.Random(options['seed'] + number)
+    connection = Connection(url, options['timeout'])
+    try:
+        while time.monotonic() < options['deadline']:
+            await Session(
+                connection, stats, rng.choice(accounts), rng, context
+            ).run()
+            if options['think_time']:
+                await asyncio.sleep(rng.expovariate(1 / options['think_time']))
+    finally:
+        connection.close()
+
+
+async def run_load_test(url, accounts, concurrency, duration, seed=0,
+                        timeout=30, think_time=0, create_ratio=0.1):
+    if len(accounts) < concurrency:
+        raise LoadTestError(
+            f'Пользователей {len(accounts)}, нужно не меньше {concurrency}'
+        )
+    context = await load_context(url, timeout, create_ratio)
+    stats = Stats()
+    started = time.monotonic()
+    options = {
+        'seed': seed,
+        'timeout': timeout,
+        'think_time': think_time,
+        'deadline': started + duration,
+    }
+    await asyncio.gather(*(
+        run_worker(
+            number, url, accounts[number::concurrency], context, stats,
+            options
+        )
+        for number in range(concurrency)
+    ))
+    return stats.report(time.monotonic() - started)
+
+
+def compare(report, baseline, tolerance):
+    regressions = []
+    for name, result in report.items():
+        if name not in baseline:
+            continue
+        for percent in PERCENTILES:
+            key = f'p{percent}_ms'
+            limit = baseline[name][key] * (1 + tolerance)
+            if result[key] > limit:
+                regressions.append(
+                    f'{name} {key}: {result[key]} > {round(limit, 2)}'
+                )
+    return regressions
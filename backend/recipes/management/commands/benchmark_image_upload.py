@@ -0,0 +1,179 @@
+import argparse
+import base64
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Ingredient, Tag
+from recipes.views import RecipesViewSet
+
+User = get_user_model()
+
+MODES = ('json', 'multipart')
+
+
+def read_proc_status(field):
+    with open('/proc/self/status') as file:
+        for line in file:
+            if line.startswith(f'{field}:'):
+                return int(line.split()[1]) * 1024
+    raise OSError(field)
+
+
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+        return read_proc_status('VmRSS')
+    except OSError:
+        return get_peak_rss()
+
+
+def get_peak_rss():
+    try:
+        return read_proc_status('VmHWM')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пиковое потребление памяти при загрузке картинки '
+        'рецепта в base64 и через multipart/form-data'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=10,
+            help='Размер картинки в мегабайтах'
+        )
+        parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+        parser.add_argument('--body', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['child']:
+            return self.run_child(options['child'], options['body'])
+        tag = Tag.objects.first()
+        ingredient = Ingredient.objects.first()
+        if tag is None or ingredient is None:
+            raise CommandError('Сначала загрузите теги и ингредиенты')
+        with tempfile.TemporaryDirectory() as directory:
+            image = self.make_image(options['size'])
+            payload = {
+                'ingredients': [{'id': ingredient.id, 'amount': 1}],
+                'tags': [tag.id],
+                'name': 'benchmark',
+                'text': 'benchmark',
+                'cooking_time': 1,
+            }
+            for mode in MODES:
+                body = os.path.join(directory, mode)
+                with open(body, 'wb') as file:
+                    file.write(self.make_body(mode, payload, image))
+                result = json.loads(subprocess.run(
+                    (
+                        sys.executable, sys.argv[0], 'benchmark_image_upload',
+                        '--child', mode, '--body', body
+                    ),
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout.strip().splitlines()[-1])
+                self.stdout.write(
+                    f'{mode:>10}: статус {result["status"]}, '
+                    f'тело {os.path.getsize(body) / 2 ** 20:.1f} МБ, '
+                    f'прирост пикового RSS '
+                    f'{result["peak_rss_delta"] / 2 ** 20:.1f} МБ, '
+                    f'{result["seconds"]:.2f} с'
+                )
+        return None
+
+    def make_image(self, size):
+        side = int((size * 2 ** 20 / 3) ** 0.5)
+        image = Image.frombytes(
+            'RGB', (side, side), os.urandom(side * side * 3)
+        )
+        with tempfile.SpooledTemporaryFile() as file:
+            image.save(file, format='PNG')
+            file.seek(0)
+            return file.read()
+
+    def make_body(self, mode, payload, image):
+        if mode == 'json':
+            payload = dict(
+                payload,
+                image='data:image/png;base64,' + base64.b64encode(
+                    image
+                ).decode('ascii')
+            )
+            return json.dumps(payload).encode()
+        boundary = self.get_boundary()
+        return b''.join((
+            f'--{boundary}\r\n'
+            'Content-Disposition: form-data; name="data"\r\n\r\n'.encode(),
+            json.dumps(payload).encode(),
+            f'\r\n--{boundary}\r\n'
+            'Content-Disposition: form-data; name="image"; '
+            'filename="benchmark.png"\r\n'
+            'Content-Type: image/png\r\n\r\n'.encode(),
+            image,
+            f'\r\n--{boundary}--\r\n'.encode(),
+        ))
+
+    def get_boundary(self):
+        return f'benchmark-{uuid.UUID(int=0).hex}'
+
+    def get_content_type(self, mode):
+        if mode == 'json':
+            return 'application/json'
+        return f'multipart/form-data; boundary={self.get_boundary()}'
+
+    def run_child(self, mode, body):
+        with tempfile.TemporaryDirectory() as media_root:
+            with override_settings(MEDIA_ROOT=media_root):
+                result = self.post_body(mode, body)
+        self.stdout.write(json.dumps(result))
+
+    def post_body(self, mode, body):
+        view = RecipesViewSet.as_view({'post': 'create'})
+        with transaction.atomic(), open(body, 'rb') as stream:
+            user = User.objects.create_user(
+                username='benchmark',
+                email='benchmark@benchmark.local',
+                password=uuid.uuid4().hex
+            )
+            token = Token.objects.create(user=user)
+            environ = RequestFactory()._base_environ(
+                PATH_INFO='/api/recipes/',
+                REQUEST_METHOD='POST',
+                CONTENT_TYPE=self.get_content_type(mode),
+                CONTENT_LENGTH=str(os.path.getsize(body)),
+                HTTP_AUTHORIZATION=f'Token {token.key}',
+            )
+            environ['wsgi.input'] = stream
+            baseline = reset_peak_rss()
+            started = time.perf_counter()
+            response = view(WSGIRequest(environ))
+            seconds = time.perf_counter() - started
+            peak_rss_delta = get_peak_rss() - baseline
+            transaction.set_rollback(True)
+        return {
+            'status': response.status_code,
+            'peak_rss_delta': peak_rss_delta,
+            'seconds': seconds,
+        }
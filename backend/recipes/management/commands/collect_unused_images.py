@@ -0,0 +1,55 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки рецептов, на которые не ссылается ни один рецепт'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=settings.UNUSED_IMAGES_MIN_AGE,
+            help='Не трогать файлы моложе указанного числа секунд'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены'
+        )
+
+    def get_used_names(self):
+        used = set()
+        for image, variants in Recipe.objects.values_list(
+            'image', 'image_variants'
+        ).iterator():
+            used.add(image)
+            for variant, formats in variants.items():
+                if variant != 'source':
+                    used.update(formats.values())
+        return used
+
+    def handle(self, *args, **options):
+        storage = Recipe.image.field.storage
+        directory = Recipe.image.field.upload_to
+        used = self.get_used_names()
+        deadline = time.time() - options['min_age']
+        removed = 0
+        for filename in storage.listdir(directory)[1]:
+            name = os.path.join(directory, filename)
+            if name in used:
+                continue
+            if storage.get_modified_time(name).timestamp() > deadline:
+                continue
+            self.stdout.write(name)
+            if not options['dry_run']:
+                storage.delete(name)
+            removed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Неиспользуемых картинок: {removed}'
+        ))
@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from recipes.fake_data import create_fake_data
+from recipes.models import Ingredient, Tag
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, рецепты, избранное, списки '
+        'покупок и подписки для нагрузочного тестирования'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--favorites', type=int, default=100000)
+        parser.add_argument('--shopping-carts', type=int, default=20000)
+        parser.add_argument('--subscriptions', type=int, default=10000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные'
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для популярности'
+        )
+        parser.add_argument(
+            '--prefix',
+            default='fake',
+            help='Префикс имён пользователей и названий рецептов'
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=8,
+            help='Сколько картинок-заглушек создать'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.FAKE_DATA_BATCH_SIZE,
+            help='Количество записей в одной транзакции'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Число процессов для вставки связей; SQLite всегда в одном'
+        )
+
+    def report(self, stage, count):
+        self.stdout.write(
+            f'{stage}: {count} за {time.perf_counter() - self.started:.2f} с'
+        )
+
+    def warn(self, message):
+        self.stdout.write(self.style.WARNING(message))
+
+    def handle(self, *args, **options):
+        counts = (
+            'users', 'recipes', 'favorites', 'shopping_carts', 'subscriptions'
+        )
+        if any(options[key] < 0 for key in counts):
+            raise CommandError('Количества не могут быть отрицательными')
+        if options['batch_size'] < 1 or options['processes'] < 1:
+            raise CommandError(
+                'Размер пачки и число процессов должны быть положительными'
+            )
+        if not Ingredient.objects.exists() or not Tag.objects.exists():
+            call_command('load_data', stdout=self.stdout)
+        self.started = time.perf_counter()
+        try:
+            create_fake_data(
+                *(options[key] for key in counts),
+                seed=options['seed'],
+                prefix=options['prefix'],
+                zipf=options['zipf'],
+                images=options['images'],
+                batch_size=options['batch_size'],
+                processes=options['processes'],
+                report=self.report,
+                warn=self.warn
+            )
+        except (ValueError, DatabaseError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - self.started:.2f} с'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import generate_image_variants
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии картинок рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии и для рецептов, у которых они уже есть'
+        )
+
+    def handle(self, *args, **options):
+        generated = 0
+        for recipe_id, image, variants in Recipe.objects.values_list(
+            'id', 'image', 'image_variants'
+        ).iterator():
+            if options['force'] or variants.get('source') != image:
+                generate_image_variants(recipe_id)
+                generated += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Копии картинок созданы для рецептов: {generated}'
+        ))
@@ -1,45 +1,85 @@
-import csv
+import os
 
-from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
 
-from recipes.models import Ingredient, Tag
+from recipes.importer import (FORMATS, IMPORT_MODELS, get_model_key,
+                              import_rows, read_rows)
+from recipes.ingredient_index import build_ingredient_index
+from recipes.reference_data import bump_reference_version
+
+DEFAULT_PATHS = (
+    os.path.join(settings.BASE_DIR, 'recipes', 'data', 'ingredients.csv'),
+    os.path.join(settings.BASE_DIR, 'recipes', 'data', 'tags.csv'),
+)
 
 
 class Command(BaseCommand):
+    help = 'Загружает ингредиенты и теги из файлов CSV, JSON и NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            help='Путь к файлу; можно указать несколько раз'
+        )
+        parser.add_argument(
+            '--model',
+            choices=tuple(IMPORT_MODELS),
+            help='Какие данные в файле; по умолчанию по имени файла'
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(set(FORMATS.values())),
+            help='Формат файла; по умолчанию по расширению'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.IMPORT_BATCH_SIZE,
+            help='Количество записей в одной транзакции'
+        )
+        parser.add_argument(
+            '--on-conflict',
+            choices=('ignore', 'update'),
+            default='ignore',
+            help='Пропускать или обновлять уже существующие записи'
+        )
 
     def handle(self, *args, **options):
-        ingredients_to_create = []
-        ingredients_to_check = set()
-        with open(
-                'recipes/data/ingredients.csv', 'r',
-                encoding='utf-8'
-        ) as file:
-            file_reader = csv.reader(file)
-            for row in file_reader:
-                name, measurement_unit = row
-                if name in ingredients_to_check:
-                    continue
-                ingredients_to_check.add(name)
-                ingredient = Ingredient(
-                    name=name, measurement_unit=measurement_unit
-                )
-                ingredients_to_create.append(ingredient)
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+        for path in options['path'] or DEFAULT_PATHS:
             try:
-                Ingredient.objects.bulk_create(ingredients_to_create)
-            except IntegrityError as error:
-                print(f'Возникла ошибка при добавлении ингредиентов: {error}')
-        tags_to_create = []
-        tags_to_check = set()
-        with open('recipes/data/tags.csv', 'r', encoding='utf-8') as file:
-            file_reader = csv.reader((file))
-            for row in file_reader:
-                name, color, slug = row
-                if name in tags_to_check:
-                    continue
-                tag = Tag(name=name, color=color, slug=slug)
-                tags_to_create.append(tag)
-            try:
-                Tag.objects.bulk_create(tags_to_create)
-            except IntegrityError as error:
-                print(f'Возникла ошибка при добавлении тегов: {error}')
+                self.load(path, options)
+            except (OSError, ValueError, DatabaseError) as error:
+                raise CommandError(f'{path}: {error}')
+        build_ingredient_index()
+        bump_reference_version()
+
+    def load(self, path, options):
+        model_key = options['model'] or get_model_key(path)
+        fields = IMPORT_MODELS[model_key][1]
+        key = IMPORT_MODELS[model_key][2]
+        processed, seconds, skipped = 0, 0, 0
+        for processed, seconds, conflicts in import_rows(
+            model_key,
+            read_rows(path, fields, options['format']),
+            options['batch_size'],
+            update=options['on_conflict'] == 'update'
+        ):
+            for row_key, field, value in conflicts:
+                self.stdout.write(self.style.WARNING(
+                    f'{model_key}: пропущена запись {key}={row_key}, '
+                    f'значение {field}={value} уже занято'
+                ))
+            skipped += len(conflicts)
+            self.stdout.write(
+                f'{model_key}: обработано {processed}, '
+                f'{processed / max(seconds, 1e-6):.0f} записей/с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{path}: загружено записей {processed - skipped} '
+            f'за {seconds:.2f} с, пропущено из-за конфликтов {skipped}'
+        ))
@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.fake_data import FAKE_PASSWORD
+from recipes.load_test import (PERCENTILES, LoadTestError, compare,
+                               run_load_test)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сервер сценариями пользователей и считает '
+        'перцентили задержек и пропускную способность по эндпоинтам'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='http://localhost:8000',
+            help='Адрес сервера (runserver, gunicorn или uvicorn)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=10,
+            help='Число одновременных пользователей'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Длительность нагрузки в секундах'
+        )
+        parser.add_argument(
+            '--prefix',
+            default='fake',
+            help='Префикс пользователей из generate_fake_data'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=0,
+            help='Средняя пауза между сессиями в секундах'
+        )
+        parser.add_argument(
+            '--create-ratio',
+            type=float,
+            default=0.1,
+            help='Доля сессий, которые создают и удаляют рецепт'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            help='Сохранить отчёт в файл как эталон'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Сравнить с эталоном и упасть при регрессии'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Допустимый рост перцентилей относительно эталона'
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError(
+                'Число пользователей и длительность должны быть положительными'
+            )
+        accounts = [
+            {'email': email, 'password': FAKE_PASSWORD}
+            for email in User.objects.filter(
+                username__startswith=options['prefix']
+            ).values_list('email', flat=True)[:options['concurrency'] * 10]
+        ]
+        if not accounts:
+            raise CommandError(
+                'Нет пользователей: сначала запустите generate_fake_data'
+            )
+        try:
+            report = asyncio.run(run_load_test(
+                options['url'],
+                accounts,
+                options['concurrency'],
+                options['duration'],
+                seed=options['seed'],
+                timeout=options['timeout'],
+                think_time=options['think_time'],
+                create_ratio=options['create_ratio']
+            ))
+        except LoadTestError as error:
+            raise CommandError(error)
+        for name, result in report.items():
+            line = f'{name:24} {result["requests"]:7} запр. ' + ' '.join(
+                f'p{percent} {result[f"p{percent}_ms"]:8.2f} мс'
+                for percent in PERCENTILES
+            ) + f' {result["rps"]:8.2f} запр./с'
+            if result['errors']:
+                line += f' ошибок {result["errors"]}'
+            self.stdout.write(
+                self.style.ERROR(line) if result['errors'] else line
+            )
+        if options['save_baseline']:
+            with open(
+                options['save_baseline'], 'w', encoding='utf-8'
+            ) as file:
+                json.dump(report, file, ensure_ascii=False, indent=2,
+                          sort_keys=True)
+                file.write('\n')
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                regressions = compare(
+                    report, json.load(file), options['tolerance']
+                )
+            if regressions:
+                raise CommandError(
+                    'Регрессия относительно эталона: '
+                    + '; '.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import ShoppingListIngredient
+from recipes.shopping_list import (get_expected_shopping_lists,
+                                   rebuild_shopping_lists)
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает и сверяет агрегированные списки покупок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только сверить агрегат с корзинами, не изменяя данные'
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            rebuild_shopping_lists()
+            self.stdout.write(self.style.SUCCESS(
+                'Списки покупок пересобраны'
+            ))
+        expected = {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount
+            in get_expected_shopping_lists().iterator()
+        }
+        actual = {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount
+            in ShoppingListIngredient.objects.values_list(
+                'user_id', 'ingredient_id', 'amount'
+            ).iterator()
+        }
+        mismatches = [
+            key for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        ]
+        if mismatches:
+            raise CommandError(
+                f'Расхождений в списках покупок: {len(mismatches)}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Списки покупок совпадают с корзинами: {len(actual)} строк'
+        ))
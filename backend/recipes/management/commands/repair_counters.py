@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from recipes.counters import recount
+from recipes.models import Favorites, Recipe
+from users.models import Subscription
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики избранного, рецептов и подписчиков'
+
+    def handle(self, *args, **options):
+        recipes, users = recount(Recipe, User, Favorites, Subscription)
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны: рецептов {recipes}, '
+            f'пользователей {users}'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 01:36
+
+from django.db import migrations, models
+
+FILL_COUNTERS = (
+    'UPDATE recipes_recipe SET favorites_count = ('
+    'SELECT COUNT(*) FROM recipes_favorites '
+    'WHERE recipes_favorites.recipe_id = recipes_recipe.id)',
+    'UPDATE users_user SET recipes_count = ('
+    'SELECT COUNT(*) FROM recipes_recipe '
+    'WHERE recipes_recipe.author_id = users_user.id), followers_count = ('
+    'SELECT COUNT(*) FROM users_subscription '
+    'WHERE users_subscription.author_id = users_user.id)',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_ingredient_name_trigram'),
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Добавлений в избранное'),
+        ),
+        migrations.RunSQL(FILL_COUNTERS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+NORMALIZED_NAME = "translate(lower(name), 'Ёё', 'ее')"
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS recipes_ingredient_name_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS recipes_ingredient_normalized_name_trgm '
+        f'ON recipes_ingredient USING gin (({NORMALIZED_NAME}) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX IF EXISTS recipes_ingredient_normalized_name_trgm'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS recipes_ingredient_name_trgm '
+        'ON recipes_ingredient USING gin (name gin_trgm_ops)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
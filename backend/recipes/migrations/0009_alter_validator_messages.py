@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 01:32
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_ingredient_normalized_name_trigram'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingredientinrecipe',
+            name='amount',
+            field=models.PositiveSmallIntegerField(help_text='Введите количество ингредиента', validators=[django.core.validators.MinValueValidator(1, message='Количество ингредиента не может быть меньше 1 и больше 32000'), django.core.validators.MaxValueValidator(32000, message='Количество ингредиента не может быть меньше 1 и больше 32000')], verbose_name='Количество ингредиента'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='cooking_time',
+            field=models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1, message='Время приготовления должно быть не менее 1 и больше 32000')], verbose_name='Время приготовления в минутах'),
+        ),
+    ]
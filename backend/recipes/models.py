@@ -4,6 +4,9 @@ from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 
+from recipes.counters import recount_after_delete
+from users.models import Subscription
+
 User = get_user_model()
 
 
@@ -58,6 +61,56 @@ class Ingredient(models.Model):
         return f'{self.name}, {self.measurement_unit}'
 
 
+class RecipeQuerySet(models.QuerySet):
+    def delete(self):
+        with recount_after_delete():
+            return super().delete()
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        return self.annotate(
+            is_favorited=models.Exists(
+                Favorites.objects.filter(
+                    user=user, recipe=models.OuterRef('pk')
+                )
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCart.objects.filter(
+                    user=user, recipe=models.OuterRef('pk')
+                )
+            ),
+        )
+
+    def with_related(self, user):
+        authors = User.objects.all()
+        if user.is_authenticated:
+            authors = authors.annotate(
+                is_subscribed=models.Exists(
+                    Subscription.objects.filter(
+                        user=user, author=models.OuterRef('pk')
+                    )
+                )
+            )
+        return self.prefetch_related(
+            models.Prefetch('author', queryset=authors),
+            models.Prefetch(
+                'ingredient_recipe',
+                queryset=IngredientInRecipe.objects.select_related(
+                    'ingredient'
+                )
+            ),
+            'tags',
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -74,6 +127,12 @@ class Recipe(models.Model):
         verbose_name='Картинка',
         upload_to='recipes/images/',
     )
+    image_variants = models.JSONField(
+        verbose_name='Уменьшенные копии картинки',
+        default=dict,
+        blank=True,
+        editable=False
+    )
     text = models.TextField(
         verbose_name='Описание рецепта',
         help_text='Опишите процесс приготовления',
@@ -102,15 +161,36 @@ class Recipe(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='Добавлений в избранное',
+        default=0,
+        editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='recipe_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    def delete(self, *args, **kwargs):
+        with recount_after_delete():
+            return super().delete(*args, **kwargs)
+
 
 class TagInRecipe(models.Model):
     recipe = models.ForeignKey(
@@ -194,6 +274,12 @@ class ShoppingCart(models.Model):
                 name='unique_shopping_cart'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('user', 'recipe'),
+                name='shopping_cart_user_idx'
+            ),
+        )
 
     def __str__(self):
         return f'{self.recipe.name} в списке покупок у {self.user.username}'
@@ -222,6 +308,40 @@ class Favorites(models.Model):
                 name='unique_favorites'
             ),
         )
+        indexes = (
+            models.Index(fields=('user', 'recipe'), name='favorites_user_idx'),
+        )
 
     def __str__(self):
         return f'{self.recipe.name} в избранном у {self.user.username}'
+
+
+class ShoppingListIngredient(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        verbose_name='Ингредиент',
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+    )
+    amount = models.IntegerField(
+        verbose_name='Общее количество ингредиента',
+    )
+
+    class Meta:
+        verbose_name = 'Ингредиент списка покупок'
+        verbose_name_plural = 'Ингредиенты списка покупок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='unique_shopping_list_ingredient'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.ingredient_id} - {self.amount} у {self.user_id}'
@@ -0,0 +1,57 @@
+import gzip
+import os
+import threading
+import uuid
+
+from django.conf import settings
+
+lock = threading.Lock()
+version_cache = {'signature': None, 'version': None}
+responses = {}
+
+
+def bump_reference_version(path=None):
+    path = path or settings.REFERENCE_DATA_VERSION_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as file:
+        file.write(uuid.uuid4().hex)
+    os.replace(temp_path, path)
+
+
+def get_reference_version(path=None):
+    path = path or settings.REFERENCE_DATA_VERSION_PATH
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        try:
+            bump_reference_version(path)
+            stat = os.stat(path)
+        except OSError:
+            return None
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if version_cache['signature'] != signature:
+        with open(path) as file:
+            version_cache['version'] = file.read().strip()
+        version_cache['signature'] = signature
+    return version_cache['version']
+
+
+def get_reference_etags(name, version):
+    return f'"{name}-{version}"', f'"{name}-{version}-gzip"'
+
+
+def get_reference_response(name, version, render):
+    cached = responses.get(name)
+    if cached is None or cached['version'] != version:
+        with lock:
+            cached = responses.get(name)
+            if cached is None or cached['version'] != version:
+                body = render()
+                cached = {
+                    'version': version,
+                    'body': body,
+                    'gzip_body': gzip.compress(body, mtime=0),
+                }
+                responses[name] = cached
+    return cached
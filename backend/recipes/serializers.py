@@ -1,5 +1,8 @@
+from django import forms
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
@@ -7,12 +10,57 @@ from rest_framework.validators import UniqueTogetherValidator
 from users.models import Subscription
 from users.serializers import CustomUserSerializer
 
+from .images import normalize_image
 from .models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
                      ShoppingCart, Tag)
+from .shopping_list import update_recipe_in_shopping_lists
 
 User = get_user_model()
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        request = self.context.get('request')
+        storage = Recipe.image.field.storage
+        variants = {}
+        for variant, formats in value.items():
+            if variant == 'source':
+                continue
+            variants[variant] = {
+                image_format: (
+                    request.build_absolute_uri(storage.url(name))
+                    if request else storage.url(name)
+                )
+                for image_format, name in formats.items()
+            }
+        return variants
+
+
+class NormalizedImageFormField(forms.ImageField):
+    def to_python(self, data):
+        file = forms.FileField.to_python(self, data)
+        if file is None:
+            return None
+        try:
+            return normalize_image(file)
+        except (OSError, SyntaxError, ValueError) as error:
+            raise forms.ValidationError(
+                self.error_messages['invalid_image'],
+                code='invalid_image'
+            ) from error
+
+
+class RecipeImageField(Base64ImageField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('_DjangoImageField', NormalizedImageFormField)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            return serializers.ImageField.to_internal_value(self, data)
+        return super().to_internal_value(data)
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
@@ -40,7 +88,7 @@ class IngredientInRecpeSerializer(serializers.ModelSerializer):
 
 
 class AddIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField()
 
     class Meta:
@@ -79,9 +127,11 @@ class FavoritesSerializer(serializers.ModelSerializer):
 
 
 class FavoritePreviewSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
 
 
 class RecipeViewSerializer(serializers.ModelSerializer):
@@ -99,6 +149,7 @@ class RecipeViewSerializer(serializers.ModelSerializer):
         read_only=True,
         source='get_is_in_shopping_cart'
     )
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -111,21 +162,28 @@ class RecipeViewSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
             'cooking_time'
         )
 
     def get_ingredients(self, obj):
-        ingredients = IngredientInRecipe.objects.filter(recipe=obj)
-        return IngredientInRecpeSerializer(ingredients, many=True).data
+        return IngredientInRecpeSerializer(
+            obj.ingredient_recipe.all(),
+            many=True
+        ).data
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
         return request.user.favorite_user.filter(recipe=obj).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
@@ -133,11 +191,8 @@ class RecipeViewSerializer(serializers.ModelSerializer):
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True
-    )
-    image = Base64ImageField()
+    tags = serializers.ListField(child=serializers.IntegerField())
+    image = RecipeImageField()
     ingredients = AddIngredientSerializer(many=True)
     author = CustomUserSerializer(read_only=True)
 
@@ -154,84 +209,129 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'cooking_time'
         )
 
-    def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        ingredients_list = set()
-        for ingredient in ingredients:
-            ingredient_id = ingredient['id']
-            if ingredient_id in ingredients_list:
-                raise serializers.ValidationError(
-                    settings.SAME_INGREDIENTS_ERROR
-                )
-            ingredients_list.add(ingredient_id)
-            if (settings.MAX_AMOUNT_VALUE < int(ingredient['amount'])
-                    <= settings.MIN_AMOUNT_VALUE):
-                raise serializers.ValidationError(
-                    settings.AMOUNT_VALUE_ERROR_MESSAGE
-                )
-        tags = self.initial_data.get('tags')
+    def get_objects(self, queryset, ids, error):
+        objects = queryset.in_bulk(ids)
+        missing = [str(pk) for pk in ids if pk not in objects]
+        if missing:
+            raise serializers.ValidationError(
+                error.format(ids=', '.join(missing))
+            )
+        return [objects[pk] for pk in ids]
+
+    def validate_ingredients(self, ingredients):
+        ids = [ingredient['id'] for ingredient in ingredients]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError(settings.SAME_INGREDIENTS_ERROR)
+        objects = self.get_objects(
+            Ingredient.objects.all(),
+            ids,
+            settings.INGREDIENTS_NOT_FOUND_ERROR
+        )
+        for ingredient, obj in zip(ingredients, objects):
+            ingredient['id'] = obj
+        return ingredients
+
+    def validate_tags(self, tags):
         if not tags:
             raise serializers.ValidationError(settings.NO_TAGS_ERROR)
-        tags_list = []
-        for tag in tags:
-            if tag in tags_list:
-                raise serializers.ValidationError(
-                    settings.SAME_TAGS_ERROR
-                )
-            tags_list.append(tag)
-        if (
-                settings.MAX_COOKING_TIME
-                < int(self.initial_data.get('cooking_time'))
-                <= settings.MIN_COOKING_TIME
-        ):
+        if len(set(tags)) != len(tags):
+            raise serializers.ValidationError(settings.SAME_TAGS_ERROR)
+        return self.get_objects(
+            Tag.objects.all(), tags, settings.TAGS_NOT_FOUND_ERROR
+        )
+
+    def validate_cooking_time(self, value):
+        if (not settings.MIN_COOKING_TIME
+                <= value <= settings.MAX_COOKING_TIME):
             raise serializers.ValidationError(
                 settings.COOKING_TIME_ERROR_MESSAGE
             )
-        return data
+        return value
 
-    def create_ingredients(self, recipe, ingredients):
+    def get_amounts(self, ingredients):
+        return {
+            ingredient['id'].id: ingredient['amount']
+            for ingredient in ingredients
+        }
+
+    def create_ingredients(self, recipe, amounts):
         IngredientInRecipe.objects.bulk_create(
-            [
-                IngredientInRecipe(
-                    recipe=recipe,
-                    ingredient=ingredient['id'],
-                    amount=ingredient['amount']
-                )
-                for ingredient in ingredients
-            ]
+            IngredientInRecipe(
+                recipe=recipe,
+                ingredient_id=ingredient_id,
+                amount=amount
+            )
+            for ingredient_id, amount in amounts.items()
         )
 
+    def save_ingredients(self, recipe, amounts):
+        amounts = dict(amounts)
+        old_amounts = {}
+        to_update = []
+        to_delete = []
+        for item in IngredientInRecipe.objects.filter(
+            recipe=recipe
+        ).only('id', 'ingredient_id', 'amount'):
+            old_amounts[item.ingredient_id] = (
+                old_amounts.get(item.ingredient_id, 0) + item.amount
+            )
+            if item.ingredient_id not in amounts:
+                to_delete.append(item.id)
+                continue
+            amount = amounts.pop(item.ingredient_id)
+            if item.amount != amount:
+                item.amount = amount
+                to_update.append(item)
+        if to_delete:
+            IngredientInRecipe.objects.filter(id__in=to_delete).delete()
+        if to_update:
+            IngredientInRecipe.objects.bulk_update(to_update, ('amount',))
+        if amounts:
+            self.create_ingredients(recipe, amounts)
+        return old_amounts
+
+    @transaction.atomic
     def create(self, validated_data):
         request = self.context.get('request')
         ingredients = validated_data.pop('ingredients', None)
         tags = validated_data.pop('tags', None)
         recipe = Recipe.objects.create(author=request.user, **validated_data)
         recipe.tags.set(tags)
-        self.create_ingredients(recipe, ingredients)
+        self.create_ingredients(recipe, self.get_amounts(ingredients))
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients = validated_data.pop('ingredients')
-        tags = validated_data.pop('tags')
-        instance.name = validated_data.get('name', instance.name)
-        instance.text = validated_data.get('text', instance.text)
-        instance.image = validated_data.get('image', instance.image)
-        instance.cooking_time = validated_data.get(
-            'cooking_time',
-            instance.cooking_time
-        )
+        ingredients = validated_data.pop('ingredients', None)
+        tags = validated_data.pop('tags', None)
+        changed_fields = [
+            field for field, value in validated_data.items()
+            if getattr(instance, field) != value
+        ]
+        for field in changed_fields:
+            setattr(instance, field, validated_data[field])
+        if changed_fields:
+            instance.save(update_fields=changed_fields)
         if tags:
             instance.tags.set(tags)
         if ingredients:
-            IngredientInRecipe.objects.filter(recipe=instance).delete()
-            self.create_ingredients(instance, ingredients)
-        instance.save()
+            new_amounts = self.get_amounts(ingredients)
+            old_amounts = self.save_ingredients(instance, new_amounts)
+            if old_amounts != new_amounts:
+                update_recipe_in_shopping_lists(
+                    instance, old_amounts, new_amounts
+                )
         return instance
 
     def to_representation(self, instance):
+        request = self.context.get('request')
+        if request:
+            instance = Recipe.objects.with_user_flags(
+                request.user
+            ).with_related(request.user).get(pk=instance.pk)
         return RecipeViewSerializer(
             instance,
-            context={'request': self.context.get('request')}
+            context={'request': request}
         ).data
 
 
@@ -268,9 +368,6 @@ class FollowRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'image', 'cooking_time')
         ordering = ('id',)
 
-    def to_representation(self, instance):
-        return RecipeViewSerializer(instance).data
-
 
 class SubscriptionSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(
@@ -297,6 +394,8 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
@@ -306,17 +405,19 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request.user.is_anonymous:
             return False
-        context = {request: request}
-        recipes_limit = request.query_params.get('recipes_limit')
-        if recipes_limit is not None:
-            recipes = obj.recipes.all()[:int(recipes_limit)]
+        context = {'request': request}
+        if hasattr(obj, 'subscription_recipes'):
+            recipes = obj.subscription_recipes
         else:
+            recipes_limit = request.query_params.get('recipes_limit')
             recipes = obj.recipes.all()
+            if recipes_limit is not None and recipes_limit.isdigit():
+                recipes = recipes[:int(recipes_limit)]
         return FollowRecipeSerializer(recipes, many=True, context=context).data
 
     @staticmethod
     def get_recipes_count(obj):
-        return obj.recipes.count()
+        return obj.recipes_count
 
 
 class ShoppingCartSerializer(serializers.ModelSerializer):
@@ -335,8 +436,12 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         request = self.context.get('request')
-        context = {'request': request}
+        recipe = instance.recipe
+        if request:
+            recipe = Recipe.objects.with_user_flags(
+                request.user
+            ).with_related(request.user).get(pk=recipe.pk)
         return RecipeViewSerializer(
-            instance.recipe,
-            context=context
+            recipe,
+            context={'request': request}
         ).data
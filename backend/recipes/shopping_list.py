@@ -0,0 +1,264 @@
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .models import IngredientInRecipe, ShoppingListIngredient
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+PDF_PENDING = 'pending'
+PDF_FAILED = 'failed'
+
+pdf_executor = ThreadPoolExecutor(
+    max_workers=settings.SHOPPING_LIST_PDF_WORKERS,
+    thread_name_prefix='shopping-list-pdf'
+)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def get_shopping_list(user):
+    return ShoppingListIngredient.objects.filter(
+        user=user
+    ).values_list(
+        'ingredient__name', 'ingredient__measurement_unit', 'amount'
+    ).order_by(
+        'ingredient__name'
+    ).iterator(chunk_size=settings.SHOPPING_LIST_CHUNK_SIZE)
+
+
+def get_recipe_amounts(recipe_id):
+    return dict(
+        IngredientInRecipe.objects.filter(
+            recipe_id=recipe_id
+        ).values_list(
+            'ingredient_id'
+        ).order_by().annotate(Sum('amount'))
+    )
+
+
+def get_expected_shopping_lists():
+    return IngredientInRecipe.objects.filter(
+        recipe__shopping_cart_recipe__isnull=False
+    ).values_list(
+        'recipe__shopping_cart_recipe__user_id', 'ingredient_id'
+    ).order_by().annotate(Sum('amount'))
+
+
+def update_shopping_lists(user_ids, deltas):
+    user_ids = list(user_ids)
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items()
+        if delta
+    }
+    if not user_ids or not deltas:
+        return
+    with transaction.atomic():
+        list(
+            User.objects.select_for_update().filter(
+                pk__in=user_ids
+            ).values_list('pk', flat=True)
+        )
+        items = ShoppingListIngredient.objects.filter(
+            user_id__in=user_ids,
+            ingredient_id__in=deltas
+        )
+        existing = set(items.values_list('user_id', 'ingredient_id'))
+        if existing:
+            items.update(amount=F('amount') + Case(
+                *(
+                    When(ingredient_id=ingredient_id, then=Value(delta))
+                    for ingredient_id, delta in deltas.items()
+                ),
+                default=Value(0),
+                output_field=IntegerField()
+            ))
+        ShoppingListIngredient.objects.bulk_create(
+            ShoppingListIngredient(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                amount=delta
+            )
+            for user_id in user_ids
+            for ingredient_id, delta in deltas.items()
+            if delta > 0 and (user_id, ingredient_id) not in existing
+        )
+        items.filter(amount__lte=0).delete()
+
+
+def update_recipe_in_shopping_lists(recipe, old_amounts, new_amounts):
+    update_shopping_lists(
+        recipe.shopping_cart_recipe.values_list('user_id', flat=True),
+        {
+            ingredient_id: (
+                new_amounts.get(ingredient_id, 0)
+                - old_amounts.get(ingredient_id, 0)
+            )
+            for ingredient_id in old_amounts.keys() | new_amounts.keys()
+        }
+    )
+
+
+def rebuild_shopping_lists():
+    with transaction.atomic():
+        ShoppingListIngredient.objects.all().delete()
+        ShoppingListIngredient.objects.bulk_create(
+            (
+                ShoppingListIngredient(
+                    user_id=user_id,
+                    ingredient_id=ingredient_id,
+                    amount=amount
+                )
+                for user_id, ingredient_id, amount
+                in get_expected_shopping_lists().iterator(
+                    chunk_size=settings.SHOPPING_LIST_CHUNK_SIZE
+                )
+            ),
+            batch_size=settings.SHOPPING_LIST_CHUNK_SIZE
+        )
+
+
+def render_txt(rows):
+    yield f'{settings.SHOPPING_LIST_TITLE}: \n'
+    for name, measurement_unit, amount in rows:
+        yield f'{name}: {amount} {measurement_unit}\n'
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for name, measurement_unit, amount in rows:
+        yield writer.writerow((name, measurement_unit, amount))
+
+
+def render_json(rows):
+    separator = '['
+    for name, measurement_unit, amount in rows:
+        yield separator + json.dumps(
+            {
+                'name': name,
+                'measurement_unit': measurement_unit,
+                'amount': amount,
+            },
+            ensure_ascii=False
+        )
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+@lru_cache(maxsize=None)
+def get_pdf_font():
+    if not os.path.exists(settings.SHOPPING_LIST_PDF_FONT):
+        return 'Helvetica'
+    pdfmetrics.registerFont(
+        TTFont('ShoppingListFont', settings.SHOPPING_LIST_PDF_FONT)
+    )
+    return 'ShoppingListFont'
+
+
+def get_pdf_path(user_id, job):
+    return os.path.join(
+        settings.SHOPPING_LIST_PDF_PATH, f'{user_id}-{job}.pdf'
+    )
+
+
+def write_pdf(user_id, path):
+    font = get_pdf_font()
+    width, height = A4
+    margin = settings.SHOPPING_LIST_PDF_MARGIN
+    line_height = settings.SHOPPING_LIST_PDF_FONT_SIZE * 1.5
+    temp_path = f'{path}.tmp'
+    try:
+        pdf = canvas.Canvas(temp_path, pagesize=A4)
+        pdf.setTitle(settings.SHOPPING_LIST_TITLE)
+        pdf.setFont(font, settings.SHOPPING_LIST_PDF_FONT_SIZE)
+        y = height - margin
+        for line in render_txt(get_shopping_list(user_id)):
+            if y < margin:
+                pdf.showPage()
+                pdf.setFont(font, settings.SHOPPING_LIST_PDF_FONT_SIZE)
+                y = height - margin
+            pdf.drawString(margin, y, line.rstrip('\n'))
+            y -= line_height
+        pdf.save()
+        os.replace(temp_path, path)
+    finally:
+        connection.close()
+
+
+def finish_pdf(path):
+    def callback(future):
+        if future.exception() is None:
+            return
+        logger.error(
+            'Не удалось подготовить PDF списка покупок %s', path,
+            exc_info=future.exception()
+        )
+        try:
+            os.replace(f'{path}.tmp', f'{path}.failed')
+        except FileNotFoundError:
+            pass
+    return callback
+
+
+def remove_old_pdfs():
+    deadline = time.time() - settings.SHOPPING_LIST_PDF_MAX_AGE
+    for entry in os.scandir(settings.SHOPPING_LIST_PDF_PATH):
+        try:
+            if entry.stat().st_mtime < deadline:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            continue
+
+
+def start_pdf(user):
+    os.makedirs(settings.SHOPPING_LIST_PDF_PATH, exist_ok=True)
+    remove_old_pdfs()
+    job = uuid.uuid4().hex
+    path = get_pdf_path(user.id, job)
+    open(f'{path}.tmp', 'wb').close()
+    pdf_executor.submit(write_pdf, user.id, path).add_done_callback(
+        finish_pdf(path)
+    )
+    return job
+
+
+def get_pdf(user, job):
+    path = get_pdf_path(user.id, job)
+    if os.path.exists(path):
+        return path, None
+    if os.path.exists(f'{path}.failed'):
+        return None, PDF_FAILED
+    try:
+        started = os.stat(f'{path}.tmp').st_mtime
+    except FileNotFoundError:
+        return None, None
+    if time.time() - started > settings.SHOPPING_LIST_PDF_TIMEOUT:
+        return None, PDF_FAILED
+    return None, PDF_PENDING
+
+
+RENDERERS = {
+    'txt': render_txt,
+    'csv': render_csv,
+    'json': render_json,
+}
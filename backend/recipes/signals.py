@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .counters import decrement, lock_deleted_row
+from .images import generate_image_variants_in_background
+from .ingredient_index import build_ingredient_index
+from .models import Favorites, Ingredient, Recipe, ShoppingCart, Tag
+from .reference_data import bump_reference_version
+from .shopping_list import get_recipe_amounts, update_shopping_lists
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_recipe_to_shopping_list(sender, instance, created, **kwargs):
+    if created:
+        update_shopping_lists(
+            (instance.user_id,),
+            get_recipe_amounts(instance.recipe_id)
+        )
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_recipe_from_shopping_list(sender, instance, **kwargs):
+    update_shopping_lists(
+        (instance.user_id,),
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount
+            in get_recipe_amounts(instance.recipe_id).items()
+        }
+    )
+
+
+def on_commit_once(func):
+    connection = transaction.get_connection()
+    if not hasattr(connection, 'pending_on_commit'):
+        connection.pending_on_commit = set()
+    pending = connection.pending_on_commit
+    pending.add(func)
+
+    def run():
+        if func in pending:
+            pending.discard(func)
+            func()
+    transaction.on_commit(run)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def rebuild_ingredient_index(sender, **kwargs):
+    on_commit_once(build_ingredient_index)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def update_reference_version(sender, **kwargs):
+    on_commit_once(bump_reference_version)
+
+
+pre_delete.connect(lock_deleted_row, sender=Favorites)
+pre_delete.connect(lock_deleted_row, sender=Recipe)
+
+
+@receiver(post_save, sender=Favorites)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if created:
+        Recipe.objects.filter(pk=instance.recipe_id).update(
+            favorites_count=F('favorites_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Favorites)
+def decrement_favorites_count(sender, instance, **kwargs):
+    decrement(sender, instance, Recipe, 'favorites_count', 'recipe')
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        User.objects.filter(pk=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    decrement(sender, instance, User, 'recipes_count', 'author')
+
+
+@receiver(post_save, sender=Recipe)
+def update_image_variants(sender, instance, **kwargs):
+    if instance.image and (
+        instance.image_variants.get('source') != instance.image.name
+    ):
+        transaction.on_commit(
+            lambda: generate_image_variants_in_background(instance.pk)
+        )
@@ -1,44 +1,82 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
 from api.filters import IngredientFilter, RecipeFilter
+from api.mixins import ReferenceDataMixin
 from api.pagination import CustomPagination
+from api.parsers import MultiPartJSONParser
 from api.permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
-from recipes.models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
-                            ShoppingCart, Tag)
+from api.renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
+from recipes.ingredient_index import search_ingredients
+from recipes.ingredient_search import search_ingredients_ranked
+from recipes.models import Favorites, Ingredient, Recipe, ShoppingCart, Tag
 from recipes.serializers import (FavoritesSerializer, IngredientSerializer,
                                  RecipeCreateSerializer, RecipeViewSerializer,
                                  ShoppingCartSerializer, TagSerializer)
+from recipes.shopping_list import (PDF_FAILED, PDF_PENDING, RENDERERS,
+                                   get_pdf, get_shopping_list, start_pdf)
 
 
-class TagsViewSet(viewsets.ReadOnlyModelViewSet):
+class TagsViewSet(ReferenceDataMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = None
+    reference_name = 'tags'
 
 
-class IngredientsViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientsViewSet(ReferenceDataMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = None
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+    reference_name = 'ingredients'
+
+    def list(self, request, *args, **kwargs):
+        search = request.query_params.get('search')
+        if search:
+            limit = request.query_params.get('limit', '')
+            limit = (
+                int(limit) if limit.isdigit()
+                else settings.INGREDIENT_SEARCH_LIMIT
+            )
+            return Response(search_ingredients_ranked(
+                search,
+                min(limit, settings.INGREDIENT_SEARCH_MAX_LIMIT)
+            ))
+        name = request.query_params.get('name')
+        if name and 'measurement_unit' not in request.query_params:
+            ingredients = search_ingredients(name)
+            if ingredients is not None:
+                return Response(ingredients)
+        return super().list(request, *args, **kwargs)
 
 
 class RecipesViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all()
     pagination_class = CustomPagination
     permission_classes = (IsAuthorOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    parser_classes = (JSONParser, MultiPartJSONParser)
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Recipe.objects.with_user_flags(user)
+        if self.action in ('list', 'retrieve'):
+            return queryset.with_related(user)
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -77,7 +115,8 @@ class RecipesViewSet(viewsets.ModelViewSet):
                 ShoppingCart.objects.create(
                     user=user,
                     recipe=get_object_or_404(Recipe, pk=pk)
-                )
+                ),
+                context={'request': request}
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         in_shopping_cart = get_object_or_404(
@@ -92,24 +131,68 @@ class RecipesViewSet(viewsets.ModelViewSet):
         methods=('get',),
         detail=False,
         url_path='download_shopping_cart',
-        permission_classes=(IsAuthenticated,)
+        permission_classes=(IsAuthenticated,),
+        renderer_classes=(
+            PlainTextRenderer,
+            CSVRenderer,
+            JSONRenderer,
+            PDFRenderer,
+        )
     )
     def download_shopping_cart(self, request):
-        shopping_cart = IngredientInRecipe.objects.filter(
-            recipe__shopping_cart_recipe__user=request.user
-        ).values_list(
-            'ingredient__name', 'ingredient__measurement_unit'
-        ).order_by(
-            'ingredient__name'
-        ).annotate(
-            ingredient_total=Sum('amount')
+        renderer = request.accepted_renderer
+        filename = f'shopping-list.{renderer.format}'
+        if renderer.format == 'pdf':
+            url = reverse(
+                'recipes-download-shopping-cart-pdf',
+                kwargs={'job': start_pdf(request.user)},
+                request=request
+            )
+            return self.pdf_pending(url)
+        response = StreamingHttpResponse(
+            RENDERERS[renderer.format](get_shopping_list(request.user)),
+            content_type=f'{renderer.media_type}; charset=utf-8'
         )
-        text = 'Список покупок: \n'
-        for ingredients in shopping_cart:
-            name, measurement_unit, amount = ingredients
-            text += f'{name}: {amount} {measurement_unit}\n'
-        response = HttpResponse(text, content_type='text/plain')
         response['Content-Disposition'] = (
-            'attachment; filename="shopping-list.txt"'
+            f'attachment; filename="{filename}"'
+        )
+        return response
+
+    @action(
+        methods=('get',),
+        detail=False,
+        url_path=r'download_shopping_cart/(?P<job>[0-9a-f]{32})',
+        url_name='download-shopping-cart-pdf',
+        permission_classes=(IsAuthenticated,),
+        renderer_classes=(JSONRenderer, PDFRenderer)
+    )
+    def download_shopping_cart_pdf(self, request, job):
+        path, state = get_pdf(request.user, job)
+        if path is not None:
+            return FileResponse(
+                open(path, 'rb'),
+                as_attachment=True,
+                filename='shopping-list.pdf',
+                content_type=PDFRenderer.media_type
+            )
+        if state == PDF_PENDING:
+            return self.pdf_pending(request.build_absolute_uri())
+        if state == PDF_FAILED:
+            return JsonResponse(
+                {'detail': settings.SHOPPING_LIST_PDF_FAILED},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return JsonResponse(
+            {'detail': settings.SHOPPING_LIST_PDF_NOT_FOUND},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    @staticmethod
+    def pdf_pending(url):
+        response = JsonResponse(
+            {'detail': settings.SHOPPING_LIST_PDF_PENDING, 'url': url},
+            status=status.HTTP_202_ACCEPTED
         )
+        response['Location'] = url
+        response['Retry-After'] = settings.SHOPPING_LIST_PDF_RETRY_AFTER
         return response
@@ -0,0 +1,126 @@
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.fake_data import FAKE_PASSWORD, create_fake_data
+from recipes.models import Favorites, Ingredient, ShoppingCart, Tag
+from users.models import Subscription, User
+
+FAVORITES = int(os.getenv('TEST_FAVORITES', default=50_000))
+ACTOR_ITEMS = 10
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-report',
+        help='Куда сохранить JSON-отчёт о числе запросов и времени ответа'
+    )
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_paths(tmp_path_factory):
+    root = tmp_path_factory.mktemp('foodgram')
+    with override_settings(
+        MEDIA_ROOT=str(root / 'media'),
+        INGREDIENT_INDEX_PATH=str(root / 'index' / 'ingredients.idx'),
+        REFERENCE_DATA_VERSION_PATH=str(root / 'index' / 'reference.version'),
+        PROFILING_PATH=str(root / 'profiles'),
+        METRICS_PATH=str(root / 'metrics'),
+        SHOPPING_LIST_PDF_PATH=str(root / 'shopping_lists'),
+    ):
+        yield root
+
+
+def prepare_actor(actor, user_ids, recipe_ids):
+    for recipe_id in recipe_ids[1:ACTOR_ITEMS + 1]:
+        Favorites.objects.get_or_create(user=actor, recipe_id=recipe_id)
+        ShoppingCart.objects.get_or_create(user=actor, recipe_id=recipe_id)
+    for author_id in user_ids[2:ACTOR_ITEMS + 2]:
+        Subscription.objects.get_or_create(user=actor, author_id=author_id)
+    Favorites.objects.filter(user=actor, recipe_id=recipe_ids[0]).delete()
+    ShoppingCart.objects.filter(user=actor, recipe_id=recipe_ids[0]).delete()
+    Subscription.objects.filter(user=actor, author_id=user_ids[1]).delete()
+
+
+@pytest.fixture(scope='session')
+def dataset(django_db_setup, django_db_blocker, isolated_paths):
+    with django_db_blocker.unblock():
+        call_command('load_data', stdout=StringIO())
+        user_ids, recipe_ids = create_fake_data(
+            users=FAVORITES // 25,
+            recipes=FAVORITES // 5,
+            favorites=FAVORITES,
+            shopping_carts=FAVORITES // 10,
+            subscriptions=FAVORITES // 10,
+            prefix='test'
+        )
+        actor = User.objects.get(pk=user_ids[0])
+        prepare_actor(actor, user_ids, recipe_ids)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        tag = Tag.objects.order_by('id').first()
+        ingredient = Ingredient.objects.order_by('id').first()
+        return {
+            'actor': actor.id,
+            'email': actor.email,
+            'password': FAKE_PASSWORD,
+            'token': Token.objects.get_or_create(user=actor)[0].key,
+            'author': user_ids[1],
+            'recipe': recipe_ids[0],
+            'user_ids': user_ids,
+            'recipe_ids': recipe_ids,
+            'tag': tag.id,
+            'tag_slug': tag.slug,
+            'ingredient': ingredient.id,
+            'ingredients': list(
+                Ingredient.objects.order_by('id').values_list(
+                    'id', flat=True
+                )[:3]
+            ),
+            'prefix': ingredient.name[:2],
+        }
+
+
+@pytest.fixture
+def actor(dataset, db):
+    return User.objects.get(pk=dataset['actor'])
+
+
+@pytest.fixture
+def anonymous_client():
+    return APIClient()
+
+
+@pytest.fixture
+def actor_client(dataset, db):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {dataset["token"]}')
+    return client
+
+
+@pytest.fixture(scope='session')
+def query_report(request):
+    report = {}
+    yield report
+    path = request.config.getoption('--query-report')
+    if path:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    'vendor': connection.vendor,
+                    'favorites': FAVORITES,
+                    'endpoints': report,
+                },
+                file,
+                ensure_ascii=False,
+                indent=2,
+                sort_keys=True
+            )
+            file.write('\n')
@@ -0,0 +1,113 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favorites, Recipe
+from users.models import Subscription, User
+
+# Список в админке делает 4-5 запросов независимо от объёма данных, и ещё
+# по одному на объект, выбранный в фильтре с автодополнением.
+CHANGELIST_MAX_QUERIES = 6
+
+
+@pytest.fixture
+def admin_client(client, dataset):
+    client.force_login(User.objects.create_superuser(
+        username='test-admin', email='test-admin@example.com',
+        password='password', first_name='admin', last_name='admin'
+    ))
+    return client
+
+
+def get_changelist(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert len(context.captured_queries) <= CHANGELIST_MAX_QUERIES, (
+        '\n'.join(query['sql'] for query in context.captured_queries)
+    )
+    return response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', (
+    '/admin/recipes/recipe/',
+    '/admin/recipes/favorites/',
+    '/admin/recipes/shoppingcart/',
+    '/admin/users/user/',
+    '/admin/users/subscription/',
+))
+def test_changelist_renders_filters(url, admin_client):
+    response = get_changelist(admin_client, url)
+    assert 'id="changelist-filter"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_recipe_filters(admin_client, dataset):
+    recipe = Recipe.objects.get(pk=dataset['recipe'])
+    response = get_changelist(
+        admin_client,
+        f'/admin/recipes/recipe/?author__pk__exact={recipe.author_id}'
+        f'&name={recipe.name[:5]}'
+    )
+    recipes = response.context['cl'].result_list
+    assert recipe in recipes
+    assert all(
+        item.author_id == recipe.author_id
+        and item.name.lower().startswith(recipe.name[:5].lower())
+        for item in recipes
+    )
+    content = response.content.decode()
+    assert 'admin/js/autocomplete_filter.js' in content
+    assert f'<option value="{recipe.author_id}" selected>' in content
+
+
+@pytest.mark.django_db
+def test_favorites_user_filter(admin_client, dataset):
+    response = get_changelist(
+        admin_client,
+        f'/admin/recipes/favorites/?user__pk__exact={dataset["actor"]}'
+    )
+    assert {
+        item.pk for item in response.context['cl'].result_list
+    } == set(Favorites.objects.filter(
+        user_id=dataset['actor']
+    ).values_list('pk', flat=True))
+
+
+@pytest.mark.django_db
+def test_subscription_filters(admin_client, dataset):
+    subscription = Subscription.objects.filter(
+        user_id=dataset['actor']
+    ).first()
+    response = get_changelist(
+        admin_client,
+        f'/admin/users/subscription/?user__pk__exact={dataset["actor"]}'
+        f'&author__pk__exact={subscription.author_id}'
+    )
+    assert list(response.context['cl'].result_list) == [subscription]
+
+
+@pytest.mark.django_db
+def test_user_filters(admin_client, dataset):
+    response = get_changelist(
+        admin_client, f'/admin/users/user/?email={dataset["email"]}'
+    )
+    assert [
+        user.pk for user in response.context['cl'].result_list
+    ] == [dataset['actor']]
+
+
+@pytest.mark.django_db
+def test_autocomplete_source_for_filter(admin_client, dataset):
+    user = User.objects.get(pk=dataset['actor'])
+    response = admin_client.get('/admin/autocomplete/', {
+        'term': user.username,
+        'app_label': 'recipes',
+        'model_name': 'favorites',
+        'field_name': 'user',
+    })
+    assert response.status_code == 200
+    assert str(user.pk) in {
+        item['id'] for item in response.json()['results']
+    }
@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favorites, Recipe
+from users.models import Subscription, User
+
+from .utils import QUERY_BUDGET_MARGIN, create_recipe
+
+FAVORITES = 30
+RECIPE_DELETE_BUDGET = 11
+
+
+@pytest.mark.django_db
+def test_repeated_delete_decrements_once(dataset):
+    recipe = Recipe.objects.get(pk=dataset['recipe'])
+    favorite = Favorites.objects.create(
+        user_id=dataset['actor'], recipe=recipe
+    )
+    stale = Favorites.objects.get(pk=favorite.pk)
+    favorite.delete()
+    stale.delete()
+    recipe.refresh_from_db()
+    assert recipe.favorites_count == Favorites.objects.filter(
+        recipe=recipe
+    ).count()
+
+
+@pytest.mark.django_db
+def test_counter_does_not_go_below_zero(dataset):
+    author = User.objects.get(pk=dataset['author'])
+    subscription = Subscription.objects.create(
+        user_id=dataset['actor'], author=author
+    )
+    User.objects.filter(pk=author.pk).update(followers_count=0)
+    subscription.delete()
+    author.refresh_from_db()
+    assert author.followers_count == 0
+
+
+@pytest.mark.django_db
+def test_recipe_delete_queries_do_not_grow_with_favorites(dataset,
+                                                          actor_client):
+    counts = []
+    for favorites in (1, FAVORITES):
+        recipe_id = create_recipe(dataset, actor_client)['new_recipe']
+        Favorites.objects.bulk_create(
+            Favorites(user_id=user_id, recipe_id=recipe_id)
+            for user_id in dataset['user_ids'][:favorites]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = actor_client.delete(f'/api/recipes/{recipe_id}/')
+        assert response.status_code == 204
+        counts.append(len(queries))
+    assert counts[0] == counts[1]
+    assert counts[1] <= RECIPE_DELETE_BUDGET + QUERY_BUDGET_MARGIN
+    actor = User.objects.get(pk=dataset['actor'])
+    assert actor.recipes_count == actor.recipes.count()
+
+
+@pytest.mark.django_db
+def test_user_delete_recounts_other_counters(dataset):
+    user = User.objects.get(pk=dataset['user_ids'][-1])
+    recipe = Recipe.objects.exclude(author=user).get(pk=dataset['recipe'])
+    author = User.objects.get(pk=dataset['author'])
+    Favorites.objects.get_or_create(user=user, recipe=recipe)
+    Subscription.objects.get_or_create(user=user, author=author)
+    recipe.refresh_from_db()
+    author.refresh_from_db()
+    favorites_count = recipe.favorites_count
+    followers_count = author.followers_count
+    user.delete()
+    recipe.refresh_from_db()
+    author.refresh_from_db()
+    assert recipe.favorites_count == favorites_count - 1
+    assert author.followers_count == followers_count - 1
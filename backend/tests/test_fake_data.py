@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from recipes.fake_data import ZipfSampler, create_fake_data, sample_pairs
+from users.models import User
+
+
+@pytest.mark.parametrize('count, expected', ((12, 12), (20, 12)))
+def test_sample_pairs_fills_pair_space(count, expected):
+    rng = random.Random(0)
+    left = ZipfSampler(rng, range(4), 3)
+    right = ZipfSampler(rng, range(4), 3)
+    pairs = sample_pairs(left, right, count, exclude_same=True)
+    assert len(pairs) == len(set(pairs)) == expected
+    assert all(user != author for user, author in pairs)
+
+
+@pytest.mark.django_db
+def test_usernames_continue_after_max_suffix(dataset):
+    for name in ('gap0', 'gap7', 'gapx'):
+        User.objects.create(username=name, email=f'{name}@example.com')
+    messages = []
+    user_ids, _ = create_fake_data(
+        users=2, recipes=0, favorites=0, shopping_carts=0,
+        subscriptions=5, prefix='gap', images=1, warn=messages.append
+    )
+    assert list(User.objects.filter(pk__in=user_ids).order_by(
+        'pk'
+    ).values_list('username', flat=True)) == ['gap8', 'gap9']
+    assert messages == ['subscription: уникальных пар только 2 из 5']
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Favorites, ShoppingCart
+from users.models import User
+
+from .utils import explain, find_problems, get_table_rows
+
+# Время ответа только попадает в отчёт --query-report: на общих раннерах CI
+# оно слишком шумное для проверки. С TEST_FAVORITES=1000000 фильтр отвечает
+# на PostgreSQL за 20-150 мс, на SQLite — за 120-550 мс.
+FILTERS = (
+    ('is_favorited', Favorites),
+    ('is_in_shopping_cart', ShoppingCart),
+)
+
+
+def get_heaviest_user(model):
+    return User.objects.get(pk=model.objects.values('user').annotate(
+        total=Count('id')
+    ).order_by('-total').values('user')[:1])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, model', FILTERS)
+@pytest.mark.parametrize('heaviest', (False, True))
+def test_filter_uses_indexes(name, model, heaviest, actor, query_report):
+    user = get_heaviest_user(model) if heaviest else actor
+    client = APIClient()
+    client.force_authenticate(user)
+    url = f'/api/recipes/?{name}=1'
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = client.get(url)
+        seconds = time.perf_counter() - started
+    assert response.status_code == 200
+    assert response.data['count'] == model.objects.filter(user=user).count()
+    query_report[f'{name}_{"heaviest" if heaviest else "actor"}'] = {
+        'method': 'GET',
+        'url': url,
+        'queries': len(context.captured_queries),
+        'rows': response.data['count'],
+        'ms': round(seconds * 1000, 2),
+    }
+    table_rows = get_table_rows()
+    problems = []
+    for query in context.captured_queries:
+        if not query['sql'].startswith('SELECT'):
+            continue
+        plan = explain(query['sql'])
+        if find_problems(plan, False, table_rows):
+            problems.append('\n'.join([query['sql'], *plan]))
+    assert not problems, '\n\n'.join(problems)
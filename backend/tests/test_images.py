@@ -0,0 +1,19 @@
+import logging
+import threading
+
+from recipes import images
+
+
+def test_failed_variants_are_logged(monkeypatch, caplog):
+    def fail(recipe_id):
+        raise OSError('broken image')
+
+    monkeypatch.setattr(images, 'generate_image_variants', fail)
+    logged = threading.Event()
+    with caplog.at_level(logging.ERROR, logger=images.__name__):
+        images.generate_image_variants_in_background(42).add_done_callback(
+            lambda future: logged.set()
+        )
+        assert logged.wait(10)
+    assert 'рецепта 42' in caplog.text
+    assert 'broken image' in caplog.text
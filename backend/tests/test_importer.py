@@ -0,0 +1,39 @@
+import pytest
+
+from recipes.importer import import_rows
+from recipes.models import Tag
+
+
+def run_import(rows, update=True):
+    conflicts = []
+    for _, _, batch_conflicts in import_rows('tags', rows, 100, update):
+        conflicts.extend(batch_conflicts)
+    return conflicts
+
+
+@pytest.mark.django_db
+def test_update_skips_rows_conflicting_on_other_unique_fields(dataset):
+    tag = Tag.objects.get(pk=dataset['tag'])
+    conflicts = run_import([
+        {'name': tag.name, 'color': '#000000', 'slug': 'new-slug'},
+        {'name': 'Новый тег', 'color': '#111111', 'slug': 'first'},
+        {'name': 'Новый тег', 'color': '#222222', 'slug': 'second'},
+        {'name': tag.name, 'color': '#333333', 'slug': tag.slug},
+    ])
+    assert conflicts == [
+        ('new-slug', 'name', tag.name),
+        ('second', 'name', 'Новый тег'),
+    ]
+    assert not Tag.objects.filter(slug__in=('new-slug', 'second')).exists()
+    assert Tag.objects.get(slug='first').name == 'Новый тег'
+    assert Tag.objects.get(pk=tag.pk).color == '#333333'
+
+
+@pytest.mark.django_db
+def test_ignore_keeps_existing_rows(dataset):
+    tag = Tag.objects.get(pk=dataset['tag'])
+    assert run_import(
+        [{'name': tag.name, 'color': '#000000', 'slug': 'new-slug'}],
+        update=False
+    ) == []
+    assert not Tag.objects.filter(slug='new-slug').exists()
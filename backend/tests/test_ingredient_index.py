@@ -0,0 +1,89 @@
+import pytest
+from django.db import transaction
+
+from recipes import signals
+from recipes.ingredient_index import (IngredientIndex,
+                                      build_ingredient_index)
+from recipes.models import Ingredient
+
+BERRIES = ['Тестежевика', 'тестежевичный джем']
+
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        signals, 'build_ingredient_index', lambda: calls.append(1)
+    )
+    return calls
+
+
+@pytest.fixture
+def index(dataset, tmp_path):
+    path = str(tmp_path / 'ingredients.idx')
+    Ingredient.objects.bulk_create((
+        Ingredient(name='тестёлочные иголки', measurement_unit='г'),
+        Ingredient(name='тестежевичный джем', measurement_unit='г'),
+        Ingredient(name='Тестежевика', measurement_unit='г'),
+    ))
+    build_ingredient_index(path)
+    index = IngredientIndex(path)
+    assert index.load()
+    return index
+
+
+def get_names(index, prefix):
+    return [ingredient['name'] for ingredient in index.search(prefix)]
+
+
+@pytest.mark.django_db
+def test_rebuild_once_per_transaction(rebuilds,
+                                      django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        for number in range(3):
+            Ingredient.objects.create(
+                name=f'тестовый ингредиент {number}',
+                measurement_unit='г'
+            )
+        Ingredient.objects.filter(name__startswith='тестовый').delete()
+    assert len(rebuilds) == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_after_rolled_back_transaction(
+        rebuilds, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(ValueError), transaction.atomic():
+            Ingredient.objects.create(
+                name='тестовый ингредиент', measurement_unit='г'
+            )
+            raise ValueError
+    assert not rebuilds
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.create(
+            name='тестовый ингредиент', measurement_unit='г'
+        )
+    assert len(rebuilds) == 1
+
+
+@pytest.mark.django_db
+def test_prefix_lookup(index):
+    assert get_names(index, 'тестежевичн') == ['тестежевичный джем']
+    assert get_names(index, '  ТЕСТЕЖЕВИ') == BERRIES
+    assert get_names(index, 'тестежевикаа') == []
+
+
+@pytest.mark.django_db
+def test_yo_and_ye_are_equal(index):
+    assert get_names(index, 'тестелочн') == ['тестёлочные иголки']
+    assert get_names(index, 'ТестЁжеви') == BERRIES
+
+
+@pytest.mark.django_db
+def test_reload_after_rebuild(index):
+    old_buffer = index.buffer
+    assert get_names(index, 'тестёжик') == []
+    Ingredient.objects.create(name='тестёжик в тумане', measurement_unit='шт')
+    build_ingredient_index(index.path)
+    assert get_names(index, 'тестежик') == ['тестёжик в тумане']
+    assert old_buffer.closed
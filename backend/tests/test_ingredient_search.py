@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.ingredient_search import search_ingredients_in_database
+from recipes.models import Ingredient
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='Поиск в базе с триграммами есть только в PostgreSQL'
+)
+
+
+def cyrillic_trigrams_supported():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT show_trgm('ж')")
+        return bool(cursor.fetchone()[0])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ('Ежевик', 'ёжевик', 'жевика'))
+def test_search_normalizes_yo(query):
+    Ingredient.objects.create(name='Ёжевика', measurement_unit='г')
+    names = [
+        ingredient['name']
+        for ingredient in search_ingredients_in_database(query, 5)
+    ]
+    assert 'Ёжевика' in names
+
+
+@pytest.mark.django_db
+def test_search_finds_misspelled_name():
+    if not cyrillic_trigrams_supported():
+        pytest.skip('pg_trgm не разбирает кириллицу в локали C')
+    Ingredient.objects.create(name='Ёжевика', measurement_unit='г')
+    assert search_ingredients_in_database('ежевка', 5)[0]['name'] == (
+        'Ёжевика'
+    )
+
+
+@pytest.mark.django_db
+def test_search_uses_trigram_index():
+    with CaptureQueriesContext(connection) as context:
+        search_ingredients_in_database('молок', 5)
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN {context.captured_queries[0]["sql"]}')
+        plan = '\n'.join(row[0] for row in cursor.fetchall())
+    assert 'recipes_ingredient_normalized_name_trgm' in plan, plan
@@ -0,0 +1,84 @@
+import json
+import subprocess
+import sys
+import time
+from ipaddress import ip_network
+
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api.metrics import ARCHIVE_FILENAME, MetricsCollector
+
+
+def get_dead_pid():
+    process = subprocess.Popen((sys.executable, '-c', ''))
+    process.wait()
+    return process.pid
+
+
+def record(collector, route='/api/recipes/'):
+    collector.record('GET', route, 0.01, 2, {'SELECT ?': (2, 0.001)})
+
+
+@override_settings(METRICS_FLUSH_INTERVAL=0.1)
+def test_idle_collector_flushes_after_interval(tmp_path):
+    collector = MetricsCollector(str(tmp_path))
+    record(collector)
+    record(collector)
+    assert not tmp_path.joinpath(collector.filename).exists()
+    time.sleep(0.3)
+    data = json.loads(tmp_path.joinpath(collector.filename).read_text())
+    assert data['requests']['GET /api/recipes/']['count'] == 2
+
+
+def test_collect_archives_dead_process_files(tmp_path):
+    dead = MetricsCollector(str(tmp_path))
+    dead.filename = f'{get_dead_pid()}-dead.json'
+    record(dead, '/api/tags/')
+    dead.flush()
+    collector = MetricsCollector(str(tmp_path))
+    record(collector)
+    for _ in range(2):
+        requests, statements = collector.collect()
+        assert requests['GET /api/tags/']['count'] == 1
+        assert requests['GET /api/recipes/']['count'] == 1
+        assert statements['SELECT ?'][0] == 4
+    assert sorted(path.name for path in tmp_path.glob('*.json')) == sorted(
+        (ARCHIVE_FILENAME, collector.filename)
+    )
+
+
+@pytest.mark.django_db
+@override_settings(METRICS_ALLOWED_NETWORKS=[ip_network('127.0.0.1/32')])
+def test_metrics_forbidden_outside_allowed_network():
+    client = APIClient()
+    assert client.get(
+        '/api/metrics/', REMOTE_ADDR='10.0.0.1'
+    ).status_code == 403
+    assert client.get(
+        '/api/metrics/', REMOTE_ADDR='127.0.0.1'
+    ).status_code == 200
+
+
+@pytest.mark.django_db
+@override_settings(
+    METRICS_ALLOWED_NETWORKS=[ip_network('192.168.1.0/24')],
+    METRICS_TRUSTED_PROXIES=[ip_network('172.16.0.0/12')]
+)
+def test_metrics_client_address_behind_trusted_proxy():
+    client = APIClient()
+    assert client.get(
+        '/api/metrics/', REMOTE_ADDR='172.18.0.5',
+        HTTP_X_REAL_IP='192.168.1.10'
+    ).status_code == 200
+    assert client.get(
+        '/api/metrics/', REMOTE_ADDR='172.18.0.5', HTTP_X_REAL_IP='10.0.0.1'
+    ).status_code == 403
+    assert client.get(
+        '/api/metrics/', REMOTE_ADDR='172.18.0.5'
+    ).status_code == 403
+    assert client.get(
+        '/api/metrics/', REMOTE_ADDR='10.0.0.1',
+        HTTP_X_REAL_IP='192.168.1.10'
+    ).status_code == 403
@@ -0,0 +1,46 @@
+import pytest
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+PROFILING_TOKEN = 'secret'
+
+
+@pytest.mark.django_db
+def test_anonymous_response_has_no_server_timing(anonymous_client):
+    response = anonymous_client.get('/api/tags/')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response
+
+
+@pytest.mark.django_db
+@override_settings(PROFILING_TOKEN=PROFILING_TOKEN)
+def test_wrong_profiling_token_has_no_server_timing(anonymous_client):
+    response = anonymous_client.get('/api/tags/', HTTP_X_PROFILE='wrong')
+    assert 'Server-Timing' not in response
+    assert 'X-Profile-Id' not in response
+
+
+@pytest.mark.django_db
+@override_settings(PROFILING_TOKEN=PROFILING_TOKEN)
+def test_profiling_token_adds_server_timing(anonymous_client):
+    response = anonymous_client.get(
+        '/api/tags/', HTTP_X_PROFILE=PROFILING_TOKEN
+    )
+    assert response['Server-Timing'].startswith('db;dur=')
+    assert response['X-Profile-Id'].endswith('.prof')
+
+
+@pytest.mark.django_db
+def test_staff_response_has_server_timing(django_user_model):
+    staff = django_user_model.objects.create_user(
+        username='staff', email='staff@example.com', password='password',
+        is_staff=True
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=staff).key}'
+    )
+    response = client.get('/api/users/me/')
+    assert response.status_code == 200
+    assert 'Server-Timing' in response
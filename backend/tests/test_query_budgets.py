@@ -0,0 +1,164 @@
+import statistics
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favorites, ShoppingCart
+from users.models import Subscription
+
+from .utils import QUERY_BUDGET_MARGIN, create_recipe, get_payloads
+
+REPEAT = 3
+
+
+def add_favorite(dataset, client):
+    Favorites.objects.create(
+        user_id=dataset['actor'], recipe_id=dataset['recipe']
+    )
+    return {}
+
+
+def add_to_shopping_cart(dataset, client):
+    ShoppingCart.objects.create(
+        user_id=dataset['actor'], recipe_id=dataset['recipe']
+    )
+    return {}
+
+
+def subscribe(dataset, client):
+    Subscription.objects.create(
+        user_id=dataset['actor'], author_id=dataset['author']
+    )
+    return {}
+
+
+def endpoint(name, method, url, budget, status=200, auth=True, payload=None,
+             setup=None):
+    return {
+        'name': name,
+        'method': method,
+        'url': url,
+        'budget': budget,
+        'status': status,
+        'auth': auth,
+        'payload': payload,
+        'setup': setup,
+    }
+
+
+ENDPOINTS = (
+    endpoint('token_login', 'post', '/api/auth/token/login/', 3,
+             auth=False, payload='login'),
+    endpoint('tags', 'get', '/api/tags/', 1, auth=False),
+    endpoint('tag', 'get', '/api/tags/{tag}/', 1, auth=False),
+    endpoint('ingredients', 'get', '/api/ingredients/', 1, auth=False),
+    endpoint('ingredients_prefix', 'get', '/api/ingredients/?name={prefix}',
+             1, auth=False),
+    endpoint('ingredients_search', 'get',
+             '/api/ingredients/?search={prefix}', 1, auth=False),
+    endpoint('ingredient', 'get', '/api/ingredients/{ingredient}/', 1,
+             auth=False),
+    endpoint('recipes_anonymous', 'get', '/api/recipes/', 5, auth=False),
+    endpoint('recipes', 'get', '/api/recipes/', 6),
+    endpoint('recipes_cursor', 'get', '/api/recipes/?cursor=', 5),
+    endpoint('recipes_filtered', 'get',
+             '/api/recipes/?tags={tag_slug}&is_favorited=1'
+             '&is_in_shopping_cart=1', 7),
+    endpoint('recipe_anonymous', 'get', '/api/recipes/{recipe}/', 4,
+             auth=False),
+    endpoint('recipe', 'get', '/api/recipes/{recipe}/', 5),
+    endpoint('recipe_create', 'post', '/api/recipes/', 14, status=201,
+             payload='recipe'),
+    endpoint('recipe_update', 'patch', '/api/recipes/{new_recipe}/', 14,
+             payload='recipe', setup=create_recipe),
+    endpoint('recipe_delete', 'delete', '/api/recipes/{new_recipe}/', 11,
+             status=204, setup=create_recipe),
+    endpoint('favorite_add', 'post', '/api/recipes/{recipe}/favorite/', 4,
+             status=201),
+    endpoint('favorite_remove', 'delete', '/api/recipes/{recipe}/favorite/',
+             5, status=204, setup=add_favorite),
+    endpoint('shopping_cart_add', 'post',
+             '/api/recipes/{recipe}/shopping_cart/', 15, status=201),
+    endpoint('shopping_cart_remove', 'delete',
+             '/api/recipes/{recipe}/shopping_cart/', 10, status=204,
+             setup=add_to_shopping_cart),
+    endpoint('shopping_cart_download', 'get',
+             '/api/recipes/download_shopping_cart/', 2),
+    endpoint('users_anonymous', 'get', '/api/users/', 2, auth=False),
+    endpoint('users', 'get', '/api/users/', 3),
+    endpoint('user', 'get', '/api/users/{author}/', 2),
+    endpoint('me', 'get', '/api/users/me/', 2),
+    endpoint('subscriptions', 'get', '/api/users/subscriptions/', 4),
+    endpoint('subscriptions_limited', 'get',
+             '/api/users/subscriptions/?recipes_limit=2', 4),
+    endpoint('subscribe', 'post', '/api/users/{author}/subscribe/', 9,
+             status=201),
+    endpoint('unsubscribe', 'delete', '/api/users/{author}/subscribe/', 6,
+             status=204, setup=subscribe),
+    endpoint('token_logout', 'post', '/api/auth/token/logout/', 2,
+             status=204),
+)
+
+
+def request(client, item, url, payload):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = getattr(client, item['method'])(
+            url, data=payload, format='json' if payload else None
+        )
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+        seconds = time.perf_counter() - started
+    return response, queries.captured_queries, seconds
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('item', ENDPOINTS, ids=lambda item: item['name'])
+def test_query_budget(item, dataset, actor_client, anonymous_client,
+                      query_report):
+    client = actor_client if item['auth'] else anonymous_client
+    context = dict(dataset)
+    if item['setup']:
+        context.update(item['setup'](dataset, actor_client))
+    url = item['url'].format(**context)
+    payload = get_payloads(dataset).get(item['payload'])
+    timings = []
+    worst = []
+    for _ in range(REPEAT if item['method'] == 'get' else 1):
+        response, queries, seconds = request(client, item, url, payload)
+        assert response.status_code == item['status'], response.content[:300]
+        timings.append(seconds)
+        if len(queries) > len(worst):
+            worst = queries
+    query_report[item['name']] = {
+        'method': item['method'].upper(),
+        'url': item['url'],
+        'budget': item['budget'],
+        'queries': len(worst),
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'max_ms': round(max(timings) * 1000, 2),
+    }
+    assert len(worst) <= item['budget'] + QUERY_BUDGET_MARGIN, '\n'.join(
+        query['sql'] for query in worst
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', (
+    '/api/recipes/?cursor=&limit={}',
+    '/api/recipes/?cursor=&limit={}&is_favorited=1',
+    '/api/users/?cursor=&limit={}',
+    '/api/users/subscriptions/?cursor=&limit={}',
+    '/api/users/subscriptions/?cursor=&limit={}&recipes_limit=3',
+))
+def test_query_count_does_not_grow_with_page(url, actor_client):
+    counts = []
+    for limit in (1, 10):
+        with CaptureQueriesContext(connection) as queries:
+            response = actor_client.get(url.format(limit))
+        assert response.status_code == 200
+        assert len(response.data['results']) == limit
+        counts.append(len(queries))
+    assert counts[0] == counts[1]
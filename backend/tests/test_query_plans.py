@@ -0,0 +1,54 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+
+from .utils import explain, find_problems, get_table_rows
+
+PAGE_LIMIT = re.compile(r' LIMIT \d+(?: OFFSET \d+)?$')
+
+ENDPOINTS = (
+    ('/api/recipes/', False, False),
+    ('/api/recipes/', True, False),
+    ('/api/recipes/?cursor=', True, False),
+    ('/api/recipes/?author={author}', True, False),
+    ('/api/recipes/?tags={tag_slug}', True, False),
+    ('/api/recipes/?is_favorited=1', True, False),
+    ('/api/recipes/?is_in_shopping_cart=1', True, False),
+    ('/api/recipes/{recipe}/', True, False),
+    ('/api/users/', True, False),
+    ('/api/users/?cursor=', True, False),
+    ('/api/users/{author}/', True, False),
+    ('/api/users/subscriptions/', True, True),
+    ('/api/recipes/download_shopping_cart/', True, False),
+)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url, auth, allow_sort', ENDPOINTS)
+def test_query_plan(url, auth, allow_sort, dataset, actor_client,
+                    anonymous_client):
+    author = User.objects.order_by('-recipes_count').first()
+    url = url.format(**{**dataset, 'author': author.id})
+    with CaptureQueriesContext(connection) as context:
+        response = (actor_client if auth else anonymous_client).get(url)
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+    assert response.status_code == 200
+    table_rows = get_table_rows()
+    problems = []
+    for query in context.captured_queries:
+        if not query['sql'].startswith('SELECT'):
+            continue
+        plan = explain(query['sql'])
+        found = find_problems(
+            plan,
+            not allow_sort and PAGE_LIMIT.search(query['sql']),
+            table_rows
+        )
+        if found:
+            problems.append('\n'.join([query['sql'], *plan]))
+    assert not problems, '\n\n'.join(problems)
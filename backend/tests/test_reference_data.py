@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes import reference_data
+
+
+@pytest.fixture
+def cold_cache():
+    reference_data.responses.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ('/api/tags/', '/api/ingredients/'))
+def test_not_modified_before_rendering(url, dataset, cold_cache,
+                                       actor_client):
+    version = reference_data.get_reference_version()
+    name = url.strip('/').split('/')[-1]
+    with CaptureQueriesContext(connection) as context:
+        response = actor_client.get(
+            url, HTTP_IF_NONE_MATCH=f'"{name}-{version}"'
+        )
+    assert response.status_code == 304
+    assert response['ETag'] == f'"{name}-{version}"'
+    assert not context.captured_queries
+    assert name not in reference_data.responses
+
+
+@pytest.mark.django_db
+def test_stale_etag_renders_body(dataset, cold_cache, anonymous_client):
+    response = anonymous_client.get(
+        '/api/tags/', HTTP_IF_NONE_MATCH='"tags-stale"'
+    )
+    assert response.status_code == 200
+    assert response['ETag'] == '"tags-{}"'.format(
+        reference_data.get_reference_version()
+    )
+
+
+@pytest.mark.django_db
+def test_authentication_outside_conditional_list(dataset, actor_client):
+    response = actor_client.get(
+        f'/api/tags/{dataset["tag"]}/', HTTP_IF_NONE_MATCH='*'
+    )
+    assert response.status_code == 200
+    assert response.wsgi_request.user.id == dataset['actor']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('encoding, if_none_match, status', (
+    ('', '"tags-{version}-gzip"', 200),
+    ('gzip', '"tags-{version}"', 200),
+    ('gzip', '"tags-{version}-gzip"', 304),
+    ('', '"other", W/"tags-{version}"', 304),
+    ('gzip', 'W/"tags-{version}-gzip" , "other"', 304),
+    ('', '"tags-{version}', 200),
+))
+def test_etag_is_compared_per_representation(encoding, if_none_match,
+                                             status, dataset,
+                                             anonymous_client):
+    version = reference_data.get_reference_version()
+    response = anonymous_client.get(
+        '/api/tags/',
+        HTTP_ACCEPT_ENCODING=encoding,
+        HTTP_IF_NONE_MATCH=if_none_match.format(version=version)
+    )
+    assert response.status_code == status
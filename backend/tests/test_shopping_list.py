@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from django.test import override_settings
+
+from recipes import shopping_list
+from users.models import User
+
+POLL_SECONDS = 10
+
+
+@pytest.mark.django_db
+def test_pdf_is_rendered_in_background(actor_client):
+    response = actor_client.get(
+        '/api/recipes/download_shopping_cart/?format=pdf'
+    )
+    assert response.status_code == 202
+    url = response['Location']
+    assert response.json()['url'] == url
+    deadline = time.monotonic() + POLL_SECONDS
+    while response.status_code == 202 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = actor_client.get(url)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/pdf'
+    assert b''.join(response.streaming_content).startswith(b'%PDF')
+
+
+@pytest.mark.django_db
+def test_unknown_pdf_job(actor_client):
+    response = actor_client.get(
+        f'/api/recipes/download_shopping_cart/{"0" * 32}/'
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_pdf_job_of_another_user(actor_client, anonymous_client, dataset):
+    url = actor_client.get(
+        '/api/recipes/download_shopping_cart/?format=pdf'
+    )['Location']
+    anonymous_client.force_authenticate(
+        User.objects.get(pk=dataset['author'])
+    )
+    assert anonymous_client.get(url).status_code == 404
+
+
+def wait_for_failure(client, url):
+    deadline = time.monotonic() + POLL_SECONDS
+    response = client.get(url)
+    while response.status_code == 202 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get(url)
+    return response
+
+
+@pytest.mark.django_db
+def test_failed_pdf_job_is_reported(actor_client, monkeypatch, caplog):
+    def fail(user_id, path):
+        raise RuntimeError('font error')
+
+    monkeypatch.setattr(shopping_list, 'write_pdf', fail)
+    url = actor_client.get(
+        '/api/recipes/download_shopping_cart/?format=pdf'
+    )['Location']
+    assert wait_for_failure(actor_client, url).status_code == 500
+    assert 'font error' in caplog.text
+
+
+@pytest.mark.django_db
+@override_settings(SHOPPING_LIST_PDF_TIMEOUT=0)
+def test_stale_pdf_job_is_reported(actor_client, monkeypatch):
+    monkeypatch.setattr(
+        shopping_list, 'write_pdf', lambda user_id, path: None
+    )
+    url = actor_client.get(
+        '/api/recipes/download_shopping_cart/?format=pdf'
+    )['Location']
+    time.sleep(0.05)
+    assert actor_client.get(url).status_code == 500
@@ -0,0 +1,16 @@
+import os
+import time
+
+from django.core.files.base import ContentFile
+
+from recipes.storage import ContentAddressedStorage
+
+
+def test_duplicate_save_refreshes_modified_time(tmp_path):
+    storage = ContentAddressedStorage(location=str(tmp_path))
+    name = storage.save('recipes/image.png', ContentFile(b'image'))
+    old = time.time() - 60 * 60
+    os.utime(storage.path(name), (old, old))
+    assert storage.save('recipes/copy.png', ContentFile(b'image')) == name
+    assert storage.get_modified_time(name).timestamp() > old + 60
+    assert storage.listdir('recipes')[1] == [os.path.basename(name)]
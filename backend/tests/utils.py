@@ -0,0 +1,110 @@
+import base64
+import re
+from io import BytesIO
+
+from django.db import connection
+from PIL import Image
+
+# Бюджет — число запросов, которое эндпоинт делает сейчас, и оно не зависит
+# от объёма данных. Запас QUERY_BUDGET_MARGIN допускает случайный лишний
+# запрос (например, SAVEPOINT), но меньше размера страницы (6), поэтому
+# N+1 на любой странице выходит за бюджет.
+QUERY_BUDGET_MARGIN = 2
+
+
+def make_image():
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), 'orange').save(buffer, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode('ascii')
+
+
+def create_recipe(dataset, client):
+    response = client.post(
+        '/api/recipes/', get_payloads(dataset)['recipe'], format='json'
+    )
+    assert response.status_code == 201, response.data
+    return {'new_recipe': response.data['id']}
+
+
+def get_payloads(dataset):
+    return {
+        'login': {'email': dataset['email'], 'password': dataset['password']},
+        'recipe': {
+            'ingredients': [
+                {'id': ingredient, 'amount': 10}
+                for ingredient in dataset['ingredients']
+            ],
+            'tags': [dataset['tag']],
+            'image': make_image(),
+            'name': 'test',
+            'text': 'test',
+            'cooking_time': 10,
+        },
+    }
+
+
+# Таблицы, которые растут вместе с данными. Полный просмотр остальных
+# (теги, ингредиенты, токены) планировщик вправе выбрать сам. PostgreSQL
+# проверяется с настройками по умолчанию: полный просмотр большой таблицы
+# ошибочен, только если по оценке он отдаёт меньше SEQ_SCAN_MIN_SHARE её
+# строк, а сортировка страницы — если сортируется больше SORT_MAX_ROWS.
+LARGE_TABLES = (
+    'recipes_recipe',
+    'recipes_favorites',
+    'recipes_shoppingcart',
+    'recipes_taginrecipe',
+    'recipes_ingredientinrecipe',
+    'recipes_shoppinglistingredient',
+    'users_user',
+    'users_subscription',
+)
+SEQ_SCAN_MIN_SHARE = 0.1
+SORT_MAX_ROWS = 1000
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)$')
+SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR (?:ORDER|GROUP) BY')
+POSTGRESQL_SCAN = re.compile(r'Seq Scan on (\w+)')
+POSTGRESQL_SORT = re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort  \(')
+POSTGRESQL_ROWS = re.compile(r'\brows=(\d+)')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def get_table_rows():
+    if connection.vendor != 'postgresql':
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relname, reltuples FROM pg_class WHERE relname IN %s',
+            [LARGE_TABLES]
+        )
+        return dict(cursor.fetchall())
+
+
+def find_problems(plan, check_sort, table_rows):
+    if connection.vendor == 'postgresql':
+        scan, sort = POSTGRESQL_SCAN, POSTGRESQL_SORT
+    else:
+        scan, sort = SQLITE_SCAN, SQLITE_SORT
+    problems = []
+    for line in plan:
+        match = scan.search(line)
+        rows = POSTGRESQL_ROWS.search(line)
+        rows = int(rows.group(1)) if rows else None
+        if match and match.group(1) in LARGE_TABLES:
+            if rows is None or rows < (
+                table_rows[match.group(1)] * SEQ_SCAN_MIN_SHARE
+            ):
+                problems.append(line.strip())
+        elif check_sort and sort.search(line):
+            if rows is None or rows > SORT_MAX_ROWS:
+                problems.append(line.strip())
+    return problems
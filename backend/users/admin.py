@@ -1,9 +1,25 @@
 from django.contrib import admin
 
+from recipes.counters import recount_after_delete
+
+from .admin_filters import (AuthorFilter, AutocompleteFilterMixin,
+                            InputFilter, UserFilter)
 from .mixins import EmptyFieldMixin
 from .models import Subscription, User
 
 
+class UsernameFilter(InputFilter):
+    title = 'Логин'
+    parameter_name = 'username'
+    lookup = 'username'
+
+
+class EmailFilter(InputFilter):
+    title = 'Почта'
+    parameter_name = 'email'
+    lookup = 'email'
+
+
 @admin.register(User)
 class UserAdmin(EmptyFieldMixin, admin.ModelAdmin):
     list_display = (
@@ -13,13 +29,23 @@ class UserAdmin(EmptyFieldMixin, admin.ModelAdmin):
         'first_name',
         'last_name',
         'created',
+        'recipes_count',
+        'followers_count',
     )
     search_fields = ('username', 'email')
-    list_filter = ('username', 'email')
+    list_filter = (UsernameFilter, EmailFilter)
+    show_full_result_count = False
+
+    def delete_queryset(self, request, queryset):
+        with recount_after_delete():
+            super().delete_queryset(request, queryset)
 
 
 @admin.register(Subscription)
-class SubscriptionAdmin(EmptyFieldMixin, admin.ModelAdmin):
+class SubscriptionAdmin(AutocompleteFilterMixin, EmptyFieldMixin):
     list_display = ('user', 'author')
-    search_fields = ('user', 'author')
-    list_filter = ('user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    list_filter = (UserFilter, AuthorFilter)
+    autocomplete_fields = ('user', 'author')
+    show_full_result_count = False
@@ -0,0 +1,87 @@
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+
+
+class InputFilter(admin.SimpleListFilter):
+    template = 'admin/input_filter.html'
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        return queryset.filter(**{self.lookup: self.value().strip()})
+
+    def choices(self, changelist):
+        yield {
+            'parameter_name': self.parameter_name,
+            'value': self.value(),
+            'params': [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, PAGE_VAR)
+            ],
+            'reset_query_string': changelist.get_query_string(
+                remove=(self.parameter_name,)
+            ),
+        }
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    template = 'admin/autocomplete_filter.html'
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.parameter_name = f'{self.field_name}__pk__exact'
+        self.field = model._meta.get_field(self.field_name)
+        self.admin_site = model_admin.admin_site
+        super().__init__(request, params, model, model_admin)
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        return queryset.filter(**{self.parameter_name: self.value()})
+
+    def choices(self, changelist):
+        field = forms.ModelChoiceField(
+            self.field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(self.field, self.admin_site),
+            required=False
+        )
+        yield {
+            'widget': field.widget.render(
+                self.parameter_name,
+                self.value(),
+                attrs={'class': 'admin-autocomplete-filter'}
+            ),
+        }
+
+
+class AutocompleteFilterMixin(admin.ModelAdmin):
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(
+            None, self.admin_site
+        ).media + forms.Media(js=('admin/js/autocomplete_filter.js',))
+
+
+class UserFilter(AutocompleteFilter):
+    title = 'Пользователь'
+    field_name = 'user'
+
+
+class AuthorFilter(AutocompleteFilter):
+    title = 'Автор'
+    field_name = 'author'
@@ -3,6 +3,7 @@ from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.password_validation import validate_password
 from django.db import models
 
+from recipes.counters import recount_after_delete
 from users.validators import (validate_non_reserved,
                               validate_username_allowed_chars)
 
@@ -52,6 +53,16 @@ class User(AbstractUser):
         verbose_name='Дата создания',
         auto_now_add=True
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Количество рецептов',
+        default=0,
+        editable=False
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Количество подписчиков',
+        default=0,
+        editable=False
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name', 'password')
@@ -60,6 +71,9 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('created',)
+        indexes = (
+            models.Index(fields=('created', 'id'), name='user_created_idx'),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=('email', 'username'),
@@ -70,6 +84,10 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    def delete(self, *args, **kwargs):
+        with recount_after_delete():
+            return super().delete(*args, **kwargs)
+
 
 class Subscription(models.Model):
     user = models.ForeignKey(
@@ -100,5 +118,11 @@ class Subscription(models.Model):
                 check=~models.Q(user=models.F('author')),
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('author', 'user'),
+                name='subscription_author_user_idx'
+            ),
+        )
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
@@ -0,0 +1,22 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from recipes.counters import decrement, lock_deleted_row
+
+from .models import Subscription, User
+
+pre_delete.connect(lock_deleted_row, sender=Subscription)
+
+
+@receiver(post_save, sender=Subscription)
+def increment_followers_count(sender, instance, created, **kwargs):
+    if created:
+        User.objects.filter(pk=instance.author_id).update(
+            followers_count=F('followers_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def decrement_followers_count(sender, instance, **kwargs):
+    decrement(sender, instance, User, 'followers_count', 'author')
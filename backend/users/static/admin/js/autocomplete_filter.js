@@ -0,0 +1,15 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    $(document).on('change', 'select.admin-autocomplete-filter', function() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete('p');
+        if (this.value) {
+            params.set(this.name, this.value);
+        } else {
+            params.delete(this.name);
+        }
+        window.location.search = params.toString();
+    });
+}
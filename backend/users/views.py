@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.db.models import (BooleanField, Exists, OuterRef, Prefetch,
+                              Subquery, Value)
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 
@@ -10,6 +12,7 @@ from rest_framework.response import Response
 
 from .models import Subscription, User
 from api.pagination import CustomPagination
+from recipes.models import Recipe
 from recipes.serializers import FollowSerializer, SubscriptionSerializer
 
 
@@ -17,6 +20,20 @@ class CustomUserViewSet(UserViewSet):
     pagination_class = CustomPagination
     lookup_field = 'id'
     search_fields = ('username',)
+    cursor_ordering = ('created', 'id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated and self.action in ('list', 'retrieve'):
+            return queryset.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        user=user, author=OuterRef('pk')
+                    )
+                )
+            )
+        return queryset
 
     @action(
         methods=('get',),
@@ -35,8 +52,26 @@ class CustomUserViewSet(UserViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def get_subscriptions(self, request):
+        recipes = Recipe.objects.only(
+            'id', 'name', 'image', 'cooking_time', 'author_id'
+        )
+        recipes_limit = request.query_params.get('recipes_limit')
+        if recipes_limit is not None and recipes_limit.isdigit():
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).order_by('-pub_date').values('pk')[:int(recipes_limit)]
+            ))
         queryset = self.paginate_queryset(
-            User.objects.filter(following__user=request.user)
+            User.objects.filter(following__user=request.user).annotate(
+                is_subscribed=Value(True, output_field=BooleanField())
+            ).order_by('created').prefetch_related(
+                Prefetch(
+                    'recipes',
+                    queryset=recipes,
+                    to_attr='subscription_recipes'
+                )
+            )
         )
         serializer = SubscriptionSerializer(
             queryset,